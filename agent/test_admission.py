@@ -0,0 +1,38 @@
+"""
+Tests for admission control of agent turns.
+"""
+
+import asyncio
+
+from travel.admission import AdmissionController
+
+def test_admits_up_to_the_limit_then_rejects_when_the_queue_is_full():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=2, queue_size=1, queue_timeout_seconds=1)
+        assert await controller.acquire() is None
+        assert await controller.acquire() is None
+        assert controller.is_saturated()
+
+        queued = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.waiting == 1
+        assert await controller.acquire() == "queue_full"
+
+        controller.release()
+        assert await queued is None
+        assert (controller.active, controller.waiting) == (2, 0)
+
+    asyncio.run(scenario())
+
+def test_rejects_a_turn_that_waits_past_the_timeout():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, queue_size=4, queue_timeout_seconds=0.01)
+        assert await controller.acquire() is None
+        assert await controller.acquire() == "queue_timeout"
+        assert (controller.active, controller.waiting) == (1, 0)
+
+        controller.release()
+        assert not controller.is_saturated()
+        assert await controller.acquire() is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,80 @@
+"""
+Tests for the response cache and the recent search results.
+"""
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from travel.cache import ResponseCache, RecentSearchResults, cacheable_question
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("travel.cache.time.time", lambda: now[0])
+    return now
+
+def test_response_cache_expires_entries(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), ttl_seconds=60)
+    cache.set("What is RSV?", "v1", "A common virus.")
+    assert cache.get("  what is rsv ", "v1") == "A common virus."
+    assert cache.get("What is RSV?", "v2") is None
+    clock[0] += 61
+    assert cache.get("What is RSV?", "v1") is None
+
+def test_response_cache_evicts_least_recently_used(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), max_entries=2)
+    cache.set("first", "v1", "1")
+    cache.set("second", "v1", "2")
+    assert cache.get("first", "v1") == "1"
+    cache.set("third", "v1", "3")
+    assert cache.get("second", "v1") is None
+    assert cache.get("first", "v1") == "1"
+    assert cache.get("third", "v1") == "3"
+
+def test_response_cache_survives_a_restart(tmp_path, clock):
+    path = str(tmp_path / "responses.sqlite")
+    ResponseCache(path).set("What is RSV?", "v1", "A common virus.")
+    assert ResponseCache(path).get("What is RSV?", "v1") == "A common virus."
+    clock[0] += 86401
+    assert ResponseCache(path).get("What is RSV?", "v1") is None
+
+def test_recent_search_results_expire(clock):
+    results = RecentSearchResults(ttl_seconds=60)
+    results.set("Pediatrician near 10001", [{"id": "place-1"}])
+    assert results.get("pediatrician near 10001") == [{"id": "place-1"}]
+    clock[0] += 61
+    assert results.get("pediatrician near 10001") is None
+
+def test_recent_search_results_evict_least_recently_used(clock):
+    results = RecentSearchResults(max_entries=2)
+    results.set("first", [{"id": "1"}])
+    results.set("second", [{"id": "2"}])
+    results.get("first")
+    results.set("third", [{"id": "3"}])
+    assert results.get("second") is None
+    assert results.get("first") == [{"id": "1"}]
+    assert results.get("third") == [{"id": "3"}]
+
+def test_recent_search_results_hand_out_copies(clock):
+    results = RecentSearchResults()
+    results.set("pharmacy", [{"id": "1"}])
+    results.get("pharmacy")[0]["id"] = "changed"
+    assert results.get("pharmacy") == [{"id": "1"}]
+    results.set("empty", [])
+    assert results.get("empty") is None
+
+PROFILES = [{"id": "emma-1", "child_name": "Emma", "facilities": [{"name": "Park Slope Pediatrics"}]}]
+
+@pytest.mark.parametrize("text, cacheable", [
+    ("When should I take my toddler to urgent care for a fever?", True),
+    ("Does Emma need a flu shot?", False),
+    ("Is Park Slope Pediatrics open on Sundays?", False),
+    ("Update the profile with her allergies", False),
+])
+def test_opening_questions_are_cacheable_unless_they_refer_to_a_profile(text, cacheable):
+    messages = [HumanMessage(content=text)]
+    assert cacheable_question({"health_profiles": PROFILES}, messages) == (text if cacheable else None)
+
+def test_follow_up_questions_are_not_cacheable():
+    messages = [HumanMessage(content="What is RSV?"), AIMessage(content="A common virus."), HumanMessage(content="Is it contagious?")]
+    assert cacheable_question({"health_profiles": []}, messages) is None
@@ -0,0 +1,95 @@
+"""
+Tests for paging through search results with server-side cursors.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from travel.cursor import SearchCursor
+
+class Pages:
+    """Serves numbered pages, failing the first attempt at each page in fail_on."""
+
+    def __init__(self, count, fail_on=(), delay=0.0):
+        self.count = count
+        self.fail_on = set(fail_on)
+        self.delay = delay
+        self.requested = []
+
+    def __call__(self, page_token):
+        number = int(page_token) if page_token else 0
+        time.sleep(self.delay)
+        self.requested.append(page_token)
+        if number in self.fail_on:
+            self.fail_on.discard(number)
+            raise ConnectionError(f"page {number} failed")
+        next_token = str(number + 1) if number + 1 < self.count else None
+        return [{"id": f"place-{number}"}], next_token
+
+def test_pages_forward_and_back_from_cache():
+    pages = Pages(3)
+    cursor = SearchCursor("pediatrician", pages)
+    assert cursor.move("first") == [{"id": "place-0"}]
+    assert cursor.move("next") == [{"id": "place-1"}]
+    assert cursor.move("previous") == [{"id": "place-0"}]
+    assert cursor.move("next") == [{"id": "place-1"}]
+    assert pages.requested == [None, "1"]
+
+def test_no_page_before_the_first_or_after_the_last():
+    cursor = SearchCursor("pediatrician", Pages(2))
+    assert cursor.move("previous") is None
+    cursor.move("first")
+    assert cursor.move("previous") is None
+    assert cursor.move("next") == [{"id": "place-1"}]
+    assert not cursor.has_next
+    assert cursor.move("next") is None
+    assert cursor.position == 1
+
+def test_resumes_at_the_failed_page():
+    pages = Pages(3, fail_on={1})
+    cursor = SearchCursor("pediatrician", pages)
+    cursor.move("first")
+    with pytest.raises(ConnectionError):
+        cursor.move("next")
+    assert cursor.position == 0
+    assert cursor.move("next") == [{"id": "place-1"}]
+    assert cursor.move("next") == [{"id": "place-2"}]
+    assert pages.requested == [None, "1", "1", "2"]
+
+def test_serves_only_cached_pages_without_fetching():
+    pages = Pages(3)
+    cursor = SearchCursor("pediatrician", pages)
+    assert cursor.move("first", fetch=False) is None
+    cursor.move("first")
+    assert cursor.move("next", fetch=False) is None
+    assert pages.requested == [None]
+
+def test_adopts_a_first_page_fetched_elsewhere():
+    pages = Pages(3)
+    cursor = SearchCursor("pediatrician", pages)
+    assert cursor.seed([{"id": "speculative-0"}], "1")
+    assert not cursor.seed([{"id": "late-0"}], "1")
+    assert cursor.move("first") == [{"id": "speculative-0"}]
+    assert cursor.move("next") == [{"id": "place-1"}]
+    assert pages.requested == ["1"]
+
+def test_concurrent_moves_each_get_their_own_page():
+    cursor = SearchCursor("pediatrician", Pages(9, delay=0.01))
+    cursor.move("first")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        pages = list(executor.map(lambda _: cursor.move("next")[0]["id"], range(8)))
+    assert sorted(pages) == [f"place-{number}" for number in range(1, 9)]
+    assert cursor.position == 8
+
+def test_cached_moves_do_not_wait_for_a_fetch_in_progress():
+    cursor = SearchCursor("pediatrician", Pages(3, delay=0.5))
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        fetching = executor.submit(cursor.move, "first")
+        time.sleep(0.05)
+        start = time.perf_counter()
+        assert cursor.move("first", fetch=False) is None
+        assert time.perf_counter() - start < 0.1
+        assert fetching.result() == [{"id": "place-0"}]
+    assert cursor.move("first", fetch=False) == [{"id": "place-0"}]
@@ -0,0 +1,69 @@
+"""
+Tests for emergency detection.
+"""
+
+import time
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from travel.emergency import EMERGENCY_GUIDANCE, EmergencyFacilityIndex, emergency_node, is_emergency
+
+@pytest.mark.parametrize("text", [
+    "my son is choking",
+    "she's not breathing",
+    "He just swallowed a battery!!",
+    "my 2 year old daughter is having a seizure",
+    "our baby is turning blue",
+    "I think he's unconscious",
+    "they drank bleach",
+    "Emma is having an anaphylactic reaction",
+    "she’s not breathing",
+    "my daughter can’t breathe",
+    "he won’t wake up",
+    "My baby swallowed a button battery",
+    "my son just ate some small magnets",
+    "this is an emergency",
+    "we have a medical emergency",
+    "we need an ambulance",
+])
+def test_detects_emergencies(text):
+    assert is_emergency(text, ["Emma"])
+
+@pytest.mark.parametrize("text", [
+    "is poison ivy contagious?",
+    "how do I prevent choking on grapes",
+    "what age can kids learn to call 911",
+    "he had a seizure last year, how do I find a neurologist",
+    "what should I do if my son swallowed a battery",
+    "find a pediatric allergist for anaphylaxis follow-up",
+    "Emma had a seizure in March",
+    "help",
+    "911",
+    "help me find a dentist",
+])
+def test_ignores_questions_and_history(text):
+    assert not is_emergency(text, ["Emma"])
+
+def test_first_emergency_after_a_restart_follows_up_with_the_nearest_facilities(monkeypatch):
+    def search(query, location_bias):
+        time.sleep(0.05)
+        return [{"name": f"{query} 1", "address": "1 Main St", "latitude": location_bias[0], "longitude": location_bias[1]}]
+
+    async def emit(config, content):
+        emitted.append(content)
+
+    emitted = []
+    monkeypatch.setattr("travel.emergency.search_healthcare_facilities_api", search)
+    monkeypatch.setattr("travel.emergency.emergency_index", EmergencyFacilityIndex())
+    monkeypatch.setattr("travel.emergency.copilotkit_emit_message", emit)
+    profile = {"id": "emma-1", "child_name": "Emma", "center_latitude": 40.7, "center_longitude": -74.0, "facilities": []}
+    state = {"messages": [HumanMessage(content="Emma is not breathing")], "health_profiles": [profile], "selected_profile_id": "emma-1"}
+
+    result = asyncio.run(emergency_node(state, {}))
+
+    assert [message.content for message in result["messages"]] == emitted
+    assert emitted[0] == EMERGENCY_GUIDANCE
+    assert emitted[1].startswith("Nearest emergency care:")
+    assert "emergency room hospital 1" in emitted[1]
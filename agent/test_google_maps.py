@@ -12,7 +12,8 @@ from dotenv import load_dotenv
 # Add the travel module to the path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from travel.search import search_healthcare_facilities_api, get_gmaps_client, search_places_geocoding_fallback
+from travel.search import search_healthcare_facilities_api, search_places_geocoding_fallback
+from travel.providers import get_gmaps_client
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
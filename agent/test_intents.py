@@ -0,0 +1,46 @@
+"""
+Tests for the rule-based intent fast path.
+"""
+
+import pytest
+
+from travel.intents import IntentRecognizer
+
+PROFILES = [
+    {"id": "emma-1", "child_name": "Emma", "facilities": []},
+    {"id": "leo-2", "child_name": "Leo", "facilities": []},
+]
+
+@pytest.mark.parametrize("text, name, args", [
+    ("select Emma's profile", "select_health_profile", {"profile_id": "emma-1"}),
+    ("switch to the profile for leo", "select_health_profile", {"profile_id": "leo-2"}),
+    ("Delete the Leo profile.", "delete_health_profiles", {"profile_ids": ["leo-2"]}),
+    ("find pharmacies near 10001", "search_for_healthcare_facilities", {"queries": ["pharmacies near 10001"]}),
+    ("find a pediatrician in Park Slope, Brooklyn", "search_for_healthcare_facilities", {"queries": ["a pediatrician in park slope, brooklyn"]}),
+    ("search for urgent care around Austin!", "search_for_healthcare_facilities", {"queries": ["urgent care around austin"]}),
+    ("find a community health center in Queens", "search_for_healthcare_facilities", {"queries": ["a community health center in queens"]}),
+])
+def test_recognizes_commands(text, name, args):
+    tool_call = IntentRecognizer().recognize(text, PROFILES)
+    assert tool_call is not None
+    assert tool_call["name"] == name
+    assert tool_call["args"] == args
+
+@pytest.mark.parametrize("text", [
+    "find pediatricians near me that take medicaid",
+    "find a pediatrician near my house please",
+    "find hospitals around here, quickly",
+    "find pharmacies near me open now",
+    "find urgent care near us",
+    "find a clinic in brooklyn that takes walk-ins",
+    "find a good restaurant in brooklyn",
+    "find health food stores in austin",
+    "find medical supply shops near 10001",
+    "search for er nurses in denver",
+    "find a pet clinic in brooklyn",
+    "look for health insurance in texas",
+    "select Mia's profile",
+    "when should my toddler see a pediatrician?",
+])
+def test_falls_through_to_the_llm(text):
+    assert IntentRecognizer().recognize(text, PROFILES) is None
@@ -0,0 +1,52 @@
+"""
+Tests for spreading calls over the API key pool.
+"""
+
+from collections import Counter
+
+import pytest
+
+from travel.keys import ApiKey, KeyPool
+
+def test_spreads_calls_by_weight():
+    pool = KeyPool([ApiKey("key-aaaa", 3), ApiKey("key-bbbb", 1)])
+    picks = [pool.acquire().key for _ in range(8)]
+    assert Counter(picks) == {"key-aaaa": 6, "key-bbbb": 2}
+    # Smooth round-robin interleaves the keys instead of using one in a burst
+    assert picks[:4].count("key-bbbb") == 1
+
+def test_parks_throttled_keys():
+    first, second = ApiKey("key-aaaa"), ApiKey("key-bbbb")
+    pool = KeyPool([first, second], park_seconds=60)
+    pool.record(first, "429")
+    assert first.is_parked(first.last_throttled_at)
+    assert {pool.acquire().key for _ in range(4)} == {"key-bbbb"}
+    assert not pool.has_available([second])
+    pool.record(first, "ok")
+    assert first.is_parked(first.last_throttled_at)
+
+def test_uses_the_key_throttled_longest_ago_when_all_are_parked(monkeypatch):
+    first, second = ApiKey("key-aaaa"), ApiKey("key-bbbb")
+    pool = KeyPool([first, second], park_seconds=60)
+    monkeypatch.setattr("travel.keys.time.time", lambda: 1000.0)
+    pool.record(second, "OVER_QUERY_LIMIT")
+    monkeypatch.setattr("travel.keys.time.time", lambda: 1001.0)
+    pool.record(first, "403")
+    assert pool.acquire() is second
+    monkeypatch.setattr("travel.keys.time.time", lambda: 1061.0)
+    assert {pool.acquire().key for _ in range(2)} == {"key-aaaa", "key-bbbb"}
+
+@pytest.mark.parametrize("spec, weights", [
+    ("key-aaaa", [1]),
+    ("key-aaaa:3, key-bbbb", [3, 1]),
+    ("key-aaaa:2,,key-bbbb:5,", [2, 5]),
+])
+def test_reads_weights_from_env(monkeypatch, spec, weights):
+    monkeypatch.setenv("GOOGLE_MAPS_API_KEYS", spec)
+    assert [key.weight for key in KeyPool.from_env().keys] == weights
+
+@pytest.mark.parametrize("spec", ["key-aaaa:0", "key-aaaa:-1", "key-aaaa:heavy", "key-aaaa:1.5"])
+def test_rejects_invalid_weights(monkeypatch, spec):
+    monkeypatch.setenv("GOOGLE_MAPS_API_KEYS", spec)
+    with pytest.raises(ValueError, match="positive integer"):
+        KeyPool.from_env()
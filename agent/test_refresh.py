@@ -0,0 +1,28 @@
+"""
+Tests for applying refreshed facilities to stored profiles.
+"""
+
+from travel.refresh import refresh_profiles
+
+SAVED = {
+    "id": "place-1", "name": "Park Slope Pediatrics", "address": "1 Old St", "latitude": 40.1, "longitude": -74.1,
+    "rating": 4.0, "facility_type": "pediatrician", "phone": "(212) 555-0100", "hours": "", "description": "Our pediatrician",
+}
+
+def test_updates_only_volatile_fields():
+    fresh = {
+        "id": "place-1", "name": "PARK SLOPE PEDS LLC", "address": "2 New St", "latitude": 40.2, "longitude": -74.2,
+        "rating": 4.5, "facility_type": "hospital", "phone": "", "hours": "Monday: 9:00 AM - 5:00 PM", "description": "Hospital",
+    }
+    profiles, closed = refresh_profiles([{"id": "emma-1", "facilities": [SAVED]}], {"place-1": fresh})
+    assert closed == 0
+    assert profiles[0]["facilities"] == [{
+        **SAVED, "address": "2 New St", "latitude": 40.2, "longitude": -74.2, "rating": 4.5, "hours": "Monday: 9:00 AM - 5:00 PM",
+    }]
+
+def test_drops_closed_facilities_and_keeps_unrefreshed_ones():
+    other = {**SAVED, "id": "place-2", "latitude": 40.3, "longitude": -74.3}
+    profiles, closed = refresh_profiles([{"id": "emma-1", "facilities": [SAVED, other]}], {"place-1": None})
+    assert closed == 1
+    assert profiles[0]["facilities"] == [other]
+    assert profiles[0]["center_latitude"] == other["latitude"]
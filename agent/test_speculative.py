@@ -0,0 +1,58 @@
+"""
+Tests for speculative searches and parsing the queries array out of streamed tool call arguments.
+"""
+
+import asyncio
+
+import pytest
+
+from travel.speculative import QueriesParser, SpeculativeSearches
+
+ARGUMENTS = '{"queries": ["pediatrician near 10001", "urgent care \\"open now\\" in Austin"], "page": "first"}'
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, len(ARGUMENTS)])
+def test_completes_each_query_once_whatever_the_chunking(size):
+    parser = QueriesParser()
+    completed = []
+    for start in range(0, len(ARGUMENTS), size):
+        completed.extend(parser.feed(ARGUMENTS[start:start + size]))
+    assert completed == ["pediatrician near 10001", 'urgent care "open now" in Austin']
+    assert parser.queries == completed
+
+def test_waits_for_a_string_to_close():
+    parser = QueriesParser()
+    assert parser.feed('{"queries": ["pediatric') == []
+    assert parser.feed('ian near 10001\\') == []
+    assert parser.feed('u00e9", ') == ["pediatrician near 10001é"]
+
+def test_ignores_everything_after_the_array():
+    parser = QueriesParser()
+    assert parser.feed('{"queries": ["pharmacy"], "other": ["not a query"]}') == ["pharmacy"]
+    assert parser.feed(', "more": ["still not"]') == []
+
+def test_discarded_searches_never_start_and_finished_ones_are_dropped():
+    async def scenario():
+        calls = []
+        searches = SpeculativeSearches()
+        searches.launch("thread", "pharmacy near 10001", lambda: calls.append("pharmacy"))
+        searches.launch("thread", "urgent care near 10001", lambda: calls.append("urgent care"))
+        # Discarded before the worker threads had a chance to run
+        searches.discard("thread", keep=["Urgent care near 10001"])
+        task = searches.take("thread", "urgent care near 10001")
+        await task
+        await asyncio.sleep(0.05)
+        assert calls == ["urgent care"]
+        assert searches.take("thread", "pharmacy near 10001") is None
+
+    asyncio.run(scenario())
+
+def test_unclaimed_searches_are_dropped_after_their_max_age():
+    async def scenario():
+        searches = SpeculativeSearches(max_age_seconds=0)
+        searches.launch("old-thread", "pharmacy near 10001", lambda: ([], None))
+        await asyncio.sleep(0.01)
+        searches.launch("new-thread", "pharmacy near 10001", lambda: ([], None))
+        assert searches.take("old-thread", "pharmacy near 10001") is None
+        await searches.take("new-thread", "pharmacy near 10001")
+
+    asyncio.run(scenario())
@@ -0,0 +1,125 @@
+"""
+Admission control for agent turns.
+
+Each worker runs at most ADMISSION_MAX_CONCURRENT turns at once. Up to
+ADMISSION_QUEUE_SIZE more wait for a slot, each for at most
+ADMISSION_QUEUE_TIMEOUT_SECONDS. Anything beyond that is turned away right away with
+a 503 and a Retry-After header, so overload shows up as fast rejections instead of
+memory growth and timeouts for every caller.
+
+While the worker is saturated the search node runs in degraded mode and serves
+searches from recent or stored results instead of calling Google.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Any, Optional
+from travel.metrics import ADMISSION_QUEUE_WAIT, ADMISSION_REJECTIONS
+
+logger = logging.getLogger(__name__)
+
+class AdmissionController:
+    """A concurrency limit with a short, deadline-bound wait queue."""
+
+    def __init__(self, max_concurrent: int = 16, queue_size: int = 32, queue_timeout_seconds: float = 2.0):
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.active = 0
+        self.waiting = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot, waiting in the queue if needed. Returns the rejection reason if none was granted."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        if not self._semaphore.locked():
+            # A free slot is taken without suspending
+            await self._semaphore.acquire()
+            ADMISSION_QUEUE_WAIT.observe(0)
+        else:
+            if self.waiting >= self.queue_size:
+                return "queue_full"
+            start = time.perf_counter()
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout_seconds)
+            except asyncio.TimeoutError:
+                return "queue_timeout"
+            finally:
+                self.waiting -= 1
+                ADMISSION_QUEUE_WAIT.observe(time.perf_counter() - start)
+
+        self.active += 1
+        return None
+
+    def release(self):
+        """Give a slot back."""
+        self.active -= 1
+        self._semaphore.release()
+
+    def is_saturated(self) -> bool:
+        """Whether every slot is taken or turns are queueing."""
+        return self.active >= self.max_concurrent or self.waiting > 0
+
+admission_controller = AdmissionController(
+    max_concurrent=int(os.getenv("ADMISSION_MAX_CONCURRENT", "16")),
+    queue_size=int(os.getenv("ADMISSION_QUEUE_SIZE", "32")),
+    queue_timeout_seconds=float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "2")),
+)
+
+def degraded_mode_enabled() -> bool:
+    """Whether saturated workers may serve searches from recent or stored results (default on)."""
+    return os.getenv("DEGRADED_MODE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+def is_degraded() -> bool:
+    """Whether searches should avoid calling Google right now."""
+    return degraded_mode_enabled() and admission_controller.is_saturated()
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that applies admission control to requests under a path prefix.
+
+    The slot is held until the downstream app returns, which for streamed responses
+    is after the last body chunk has been sent.
+    """
+
+    def __init__(self, app: Any, path_prefix: str = "/copilotkit", controller: AdmissionController = admission_controller):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.controller = controller
+        self.retry_after = os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "5")
+
+    async def __call__(self, scope: dict, receive: Any, send: Any):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        rejection = await self.controller.acquire()
+        if rejection is not None:
+            ADMISSION_REJECTIONS.inc(rejection)
+            logger.warning(f"Rejected {scope['path']} ({rejection}): {self.controller.active} active, {self.controller.waiting} waiting")
+            await self._reject(send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+    async def _reject(self, send: Any):
+        body = json.dumps({"error": "The assistant is busy, please try again shortly."}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", self.retry_after.encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -3,33 +3,41 @@ This is the main entry point for the Our Kidz healthcare assistant AI.
 It defines the workflow graph and the entry point for the agent.
 """
 # pylint: disable=line-too-long, unused-import
-from typing import cast
-from langchain_core.messages import ToolMessage, AIMessage
+from langchain_core.messages import ToolMessage
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
 from travel.trips import health_profiles_node, perform_health_profiles_node
 from travel.chat import chat_node
 from travel.search import search_node
-from travel.state import AgentState
+from travel.emergency import emergency_node
+from travel.state import AgentState, pending_tool_calls
+from travel.metrics import instrument_node
+from travel.log import configure_logging
+
+# langgraph.json loads this module directly, without demo.py or bench.py. Later calls are no-ops.
+configure_logging()
+
+PROFILE_TOOLS = ["add_health_profiles", "update_health_profiles", "delete_health_profiles"]
+SEARCH_TOOLS = ["search_for_healthcare_facilities"]
 
 # Route is responsible for determing the next node based on the last message. This
 # is needed because LangGraph does not automatically route to nodes, instead that
 # is handled through code.
 def route(state: AgentState):
-    """Route after the chat node."""
+    """Route after the chat node and after each tool node."""
     messages = state.get("messages", [])
-    if messages and isinstance(messages[-1], AIMessage):
-        ai_message = cast(AIMessage, messages[-1])
-
-        # If the last AI message has tool calls we need to determine to route to the
-        # health_profiles_node or search_node based on the tool name.
-        if ai_message.tool_calls:
-            tool_name = ai_message.tool_calls[0]["name"]
-            if tool_name in ["add_health_profiles", "update_health_profiles", "delete_health_profiles", "select_health_profile"]:
-                return "health_profiles_node"
-            if tool_name in ["search_for_healthcare_facilities"]:
-                return "search_node"
-            return "chat_node"
+
+    # The model may return several tool calls in one turn. Profile operations run first
+    # because searches attach their results to the selected profile, then all searches
+    # run together. Once every call has a response the chat node sees them in one go.
+    pending = pending_tool_calls(messages)
+    if pending:
+        tool_names = {tool_call["name"] for tool_call in pending}
+        if tool_names & set(PROFILE_TOOLS):
+            return "health_profiles_node"
+        if tool_names & set(SEARCH_TOOLS):
+            return "search_node"
+        return "chat_node"
 
     if messages and isinstance(messages[-1], ToolMessage):
         return "chat_node"
@@ -38,16 +46,19 @@ def route(state: AgentState):
 
 graph_builder = StateGraph(AgentState)
 
-graph_builder.add_node("chat_node", chat_node)
-graph_builder.add_node("health_profiles_node", health_profiles_node)
-graph_builder.add_node("search_node", search_node)
-graph_builder.add_node("perform_health_profiles_node", perform_health_profiles_node)
+graph_builder.add_node("emergency_node", instrument_node("emergency_node", emergency_node))
+graph_builder.add_node("chat_node", instrument_node("chat_node", chat_node))
+graph_builder.add_node("health_profiles_node", instrument_node("health_profiles_node", health_profiles_node))
+graph_builder.add_node("search_node", instrument_node("search_node", search_node))
+graph_builder.add_node("perform_health_profiles_node", instrument_node("perform_health_profiles_node", perform_health_profiles_node))
 
 graph_builder.add_conditional_edges("chat_node", route, ["search_node", "chat_node", "health_profiles_node", END])
 
-graph_builder.add_edge(START, "chat_node")
+# Emergencies are answered at graph entry before the normal chat turn
+graph_builder.add_edge(START, "emergency_node")
+graph_builder.add_edge("emergency_node", "chat_node")
 graph_builder.add_edge("search_node", "chat_node")
-graph_builder.add_edge("perform_health_profiles_node", "chat_node")
+graph_builder.add_conditional_edges("perform_health_profiles_node", route, ["search_node", "chat_node", "health_profiles_node", END])
 graph_builder.add_edge("health_profiles_node", "perform_health_profiles_node")
 
 # Create a fresh checkpointer instance to avoid persisted corrupted state
@@ -0,0 +1,280 @@
+"""
+End-to-end load and latency benchmark.
+
+Drives the compiled graph (or the FastAPI app from travel.demo) with a scripted fake
+chat model and a local stand-in for the Google Maps endpoints, so it runs without
+network access or API keys. Reports per-node p50/p95/p99 latency, turn latency,
+throughput at N concurrent threads and memory growth.
+
+    poetry run bench --requests 200 --concurrency 8 --llm-latency-ms 300 --places-latency-ms 150
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import asyncio
+import argparse
+import resource
+import tempfile
+import threading
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import requests
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+from travel.fakes import ScriptedChatModel, FakePlacesServer
+from travel.log import configure_logging
+
+# A mix of the turns we see in production: general questions, searches the model
+# has to plan, and mechanical commands caught by the intent fast path.
+DEFAULT_PROMPTS = [
+    "When should I take my toddler to urgent care for a fever?",
+    "Can you look for a pediatrician in Brooklyn that takes new patients?",
+    "find pharmacies near 10001",
+    "Search for urgent care near Park Slope, Brooklyn",
+    "Is it normal for a 2 year old to sleep 14 hours a day?",
+]
+
+BENCHMARK_PROFILE = {
+    "id": "benchmark-profile",
+    "child_name": "Benchmark",
+    "age": 4,
+    "center_latitude": 40.7484,
+    "center_longitude": -73.9857,
+    "zoom_level": 13,
+    "facilities": [],
+    "notes": "",
+}
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples, default=0.0) * 1000,
+    }
+
+class NodeTimer(BaseCallbackHandler):
+    """Callback handler that records how long every graph node takes."""
+
+    run_inline = True
+
+    def __init__(self, node_names: List[str]):
+        self.node_names = set(node_names)
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._started: Dict[UUID, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def on_chain_start(self, serialized: Optional[Dict[str, Any]], inputs: Any, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        name = kwargs.get("name")
+        if name in self.node_names and (metadata or {}).get("langgraph_node") == name:
+            self._started[run_id] = (name, time.perf_counter())
+
+    def _finish(self, run_id: UUID):
+        started = self._started.pop(run_id, None)
+        if started:
+            name, start = started
+            with self._lock:
+                self.samples[name].append(time.perf_counter() - start)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any):
+        self._finish(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._finish(run_id)
+
+def configure_fakes(args: argparse.Namespace) -> FakePlacesServer:
+    """Point the agent at the fake model and a local Places stand-in."""
+    # Never let a benchmark reach the real APIs
+    os.environ["GOOGLE_MAPS_API_KEY"] = "AIza-benchmark-key"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    if args.speculative:
+        os.environ["SPECULATIVE_SEARCH"] = "1"
+    if args.response_cache:
+        # A fresh cache per run, so the first turn of every general question is a miss
+        os.environ["RESPONSE_CACHE_ENABLED"] = "1"
+        os.environ["RESPONSE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench-cache-"), "responses.sqlite3")
+
+    server = FakePlacesServer(latency_seconds=args.places_latency_ms / 1000, error_rate=args.error_rate).start()
+
+    import travel.providers  # pylint: disable=import-outside-toplevel
+    import travel.chat  # pylint: disable=import-outside-toplevel
+    travel.providers.PLACES_API_BASE_URL = server.url
+    travel.providers.MAPS_API_BASE_URL = server.url
+    travel.chat.llm = ScriptedChatModel(latency_seconds=args.llm_latency_ms / 1000)
+    return server
+
+async def run_graph_turns(graph: Any, prompts: List[str], timer: NodeTimer, turn_samples: List[float], failures: List[str]):
+    """Run a sequence of turns, each in a new conversation thread, on the current event loop."""
+    for prompt in prompts:
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}, "callbacks": [timer]}
+        state = {
+            "messages": [HumanMessage(content=prompt)],
+            "health_profiles": [dict(BENCHMARK_PROFILE, facilities=[])],
+            "selected_profile_id": BENCHMARK_PROFILE["id"],
+        }
+        start = time.perf_counter()
+        try:
+            await graph.ainvoke(state, config)
+        except Exception as e:  # pylint: disable=broad-except
+            failures.append(f"{type(e).__name__}: {e}")
+        turn_samples.append(time.perf_counter() - start)
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_app_server() -> tuple[str, Any]:
+    """Serve travel.demo:app on a local port in a background thread."""
+    import uvicorn  # pylint: disable=import-outside-toplevel
+    from travel.demo import app  # pylint: disable=import-outside-toplevel
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="bench-app-server", daemon=True).start()
+    deadline = time.time() + 10
+    while not server.started and time.time() < deadline:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server
+
+def run_app_turns(base_url: str, prompts: List[str], turn_samples: List[float], failures: List[str]):
+    """Run a sequence of turns through the CopilotKit endpoint of the FastAPI app."""
+    session = requests.Session()
+    for prompt in prompts:
+        body = {
+            "name": "healthcare",
+            "threadId": str(uuid.uuid4()),
+            "state": {"health_profiles": [dict(BENCHMARK_PROFILE, facilities=[])], "selected_profile_id": BENCHMARK_PROFILE["id"]},
+            "messages": [{"id": str(uuid.uuid4()), "type": "TextMessage", "role": "user", "content": prompt}],
+            "actions": [],
+        }
+        start = time.perf_counter()
+        try:
+            response = session.post(f"{base_url}/copilotkit/agents/execute", json=body, stream=True, timeout=120)
+            for _ in response.iter_content(chunk_size=None):
+                pass
+            if response.status_code != 200:
+                failures.append(f"HTTP {response.status_code}")
+        except requests.exceptions.RequestException as e:
+            failures.append(f"{type(e).__name__}: {e}")
+        turn_samples.append(time.perf_counter() - start)
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the benchmark described by the command line arguments and return the report."""
+    places_server = configure_fakes(args)
+    from travel.agent import graph  # pylint: disable=import-outside-toplevel
+
+    timer = NodeTimer([name for name in graph.nodes if not name.startswith("__")])
+    turn_samples: List[float] = []
+    failures: List[str] = []
+    prompts = [DEFAULT_PROMPTS[i % len(DEFAULT_PROMPTS)] for i in range(args.requests)]
+    shards = [prompts[i::args.concurrency] for i in range(args.concurrency)]
+
+    app_url, app_server = (start_app_server() if args.target == "app" else (None, None))
+
+    def worker(shard: List[str]):
+        if args.target == "app":
+            run_app_turns(app_url, shard, turn_samples, failures)
+        else:
+            asyncio.run(run_graph_turns(graph, shard, timer, turn_samples, failures))
+
+    # Warm up imports, schema binding and connection pools before measuring memory
+    worker(prompts[:min(len(prompts), len(DEFAULT_PROMPTS))])
+    turn_samples.clear()
+    timer.samples.clear()
+    failures.clear()
+
+    tracemalloc.start()
+    memory_before, _ = tracemalloc.get_traced_memory()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="bench-worker") as executor:
+        list(executor.map(worker, shards))
+    elapsed = time.perf_counter() - start
+
+    memory_after, memory_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if app_server is not None:
+        app_server.should_exit = True
+    places_server.stop()
+
+    return {
+        "target": args.target,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "elapsed_s": elapsed,
+        "throughput_rps": args.requests / elapsed if elapsed else 0.0,
+        "failures": len(failures),
+        "failure_samples": failures[:5],
+        "turn_latency": summarize(turn_samples),
+        "node_latency": {name: summarize(samples) for name, samples in sorted(timer.samples.items())},
+        "places_requests": places_server.requests,
+        "places_errors": places_server.errors,
+        "memory": {
+            "traced_growth_kb": (memory_after - memory_before) / 1024,
+            "traced_peak_kb": memory_peak / 1024,
+            "max_rss_growth_kb": rss_after - rss_before,
+        },
+    }
+
+def print_report(report: Dict[str, Any]):
+    """Print a human readable benchmark report."""
+    print(f"target={report['target']} requests={report['requests']} concurrency={report['concurrency']}")
+    print(f"elapsed {report['elapsed_s']:.2f}s, throughput {report['throughput_rps']:.1f} turns/s, failures {report['failures']}")
+    print(f"places stand-in: {report['places_requests']} requests, {report['places_errors']} injected errors")
+    print()
+    print(f"{'':24}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    rows = [("turn", report["turn_latency"])] + list(report["node_latency"].items())
+    for name, stats in rows:
+        print(f"{name:24}{stats['count']:>8}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+    print()
+    memory = report["memory"]
+    print(f"memory: traced growth {memory['traced_growth_kb']:.0f} KiB, traced peak {memory['traced_peak_kb']:.0f} KiB, max RSS growth {memory['max_rss_growth_kb']} KiB")
+    for failure in report["failure_samples"]:
+        print(f"failure: {failure}")
+
+def main(argv: Optional[List[str]] = None):
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Offline load and latency benchmark for the healthcare agent.")
+    parser.add_argument("--target", choices=["graph", "app"], default="graph", help="drive the compiled graph directly or the FastAPI app over HTTP (per-node latency is only available for the graph)")
+    parser.add_argument("--requests", type=int, default=100, help="total number of turns to run")
+    parser.add_argument("--concurrency", type=int, default=4, help="number of concurrent worker threads")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated generation time per LLM call")
+    parser.add_argument("--places-latency-ms", type=float, default=0.0, help="latency added by the Places stand-in")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability the Places stand-in fails a request")
+    parser.add_argument("--speculative", action="store_true", help="stream the model and start searches before its response is complete")
+    parser.add_argument("--response-cache", action="store_true", help="answer repeated general questions from a fresh response cache")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    args.concurrency = max(1, min(args.concurrency, args.requests))
+    configure_logging(level=os.getenv("LOG_LEVEL", "WARNING"))
+
+    report = run_benchmark(args)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+
+if __name__ == "__main__":
+    main()
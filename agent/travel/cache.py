@@ -0,0 +1,193 @@
+"""
+Opt-in response cache for stateless general-health questions.
+
+Answers are keyed by the normalized question text plus the version of the system
+prompt they were generated with, kept in an in-memory LRU and persisted to a local
+SQLite file so they survive restarts. Only self-contained opening questions that do
+not refer to a profile are cached, and they are answered without profile data.
+
+Recent facility search results are also kept in a small in-memory LRU so a saturated
+worker can answer repeated searches without calling Google.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any
+from langchain_core.messages import BaseMessage, HumanMessage
+from travel.state import AgentState, HealthProfile
+
+logger = logging.getLogger(__name__)
+
+def response_cache_enabled() -> bool:
+    """Whether the response cache has been turned on through the environment."""
+    return os.getenv("RESPONSE_CACHE_ENABLED", "").lower() in ("1", "true", "yes")
+
+def normalize_question(text: str) -> str:
+    """Normalize question text so trivially different phrasings share a cache key."""
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+class ResponseCache:
+    """An LRU response cache with TTL expiry backed by a local SQLite file."""
+
+    def __init__(self, path: str, ttl_seconds: float = 86400, max_entries: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - ttl_seconds,))
+        self._db.commit()
+
+        # Warm the in-memory LRU with the most recent entries on disk
+        rows = self._db.execute(
+            "SELECT key, response, created_at FROM responses ORDER BY created_at DESC LIMIT ?", (max_entries,)
+        ).fetchall()
+        for key, response, created_at in reversed(rows):
+            self._entries[key] = (response, created_at)
+
+    @staticmethod
+    def make_key(question: str, prompt_version: str) -> str:
+        """Build the cache key for a question under a given prompt version."""
+        normalized = normalize_question(question)
+        return hashlib.sha256(f"{prompt_version}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, question: str, prompt_version: str) -> Optional[str]:
+        """Return the cached response for a question, or None on a miss."""
+        key = self.make_key(question, prompt_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, created_at = entry
+            if time.time() - created_at > self.ttl_seconds:
+                del self._entries[key]
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def set(self, question: str, prompt_version: str, response: str):
+        """Store a response, evicting the least recently used entries past capacity."""
+        key = self.make_key(question, prompt_version)
+        created_at = time.time()
+        with self._lock:
+            self._entries[key] = (response, created_at)
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                evicted.append((evicted_key,))
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                (key, response, created_at),
+            )
+            if evicted:
+                self._db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+            self._db.commit()
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the process-wide response cache, or None if it is disabled."""
+    global _response_cache
+    if not response_cache_enabled():
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                path=os.getenv("RESPONSE_CACHE_PATH", ".cache/responses.sqlite3"),
+                ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400")),
+                max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000")),
+            )
+        return _response_cache
+
+class RecentSearchResults:
+    """An in-memory LRU of recent facility search results keyed by normalized query."""
+
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 500):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[List[Dict[str, Any]], float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the facilities last found for a query, or None if there are none or they expired."""
+        key = normalize_question(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            facilities, created_at = entry
+            if time.time() - created_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return [dict(facility) for facility in facilities]
+
+    def set(self, query: str, facilities: List[Dict[str, Any]]):
+        """Remember the facilities found for a query."""
+        if not facilities:
+            return
+        key = normalize_question(query)
+        with self._lock:
+            self._entries[key] = ([dict(facility) for facility in facilities], time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+recent_search_results = RecentSearchResults(
+    ttl_seconds=float(os.getenv("RECENT_SEARCH_TTL_SECONDS", "3600")),
+    max_entries=int(os.getenv("RECENT_SEARCH_MAX_ENTRIES", "500")),
+)
+
+def mentions_profile_data(text: str, health_profiles: List[HealthProfile]) -> bool:
+    """Check whether a piece of text references any stored health profile."""
+    normalized = f" {normalize_question(text)} "
+    if " profile " in normalized or " profiles " in normalized:
+        return True
+    for profile in health_profiles:
+        for value in (profile.get("id"), profile.get("child_name")):
+            if value and f" {normalize_question(str(value))} " in normalized:
+                return True
+        for facility in profile.get("facilities", []) or []:
+            if facility.get("name") and f" {normalize_question(facility['name'])} " in normalized:
+                return True
+    return False
+
+def cacheable_question(state: AgentState, messages: List[BaseMessage]) -> Optional[str]:
+    """
+    Return the question text if this turn is safe to answer from the cache.
+
+    A turn qualifies only when it is the opening question of the conversation and does
+    not refer to a stored profile, so the answer cannot depend on earlier context. Such
+    turns are answered with a system prompt that leaves the profiles out, so the answer
+    cannot draw on them (ages, notes, allergies) either.
+    """
+    human_messages = [m for m in messages if isinstance(m, HumanMessage)]
+    if len(human_messages) != 1 or messages[-1] is not human_messages[0]:
+        return None
+
+    question = human_messages[0].content
+    if not isinstance(question, str) or not normalize_question(question):
+        return None
+
+    if mentions_profile_data(question, state.get("health_profiles", []) or []):
+        return None
+
+    return question
@@ -1,36 +1,36 @@
 import json
+import asyncio
+import hashlib
+import logging
 from travel.state import AgentState
 from langchain_core.messages import SystemMessage
 from langchain_openai import ChatOpenAI
-from travel.search import search_for_healthcare_facilities
+from travel.search import search_for_healthcare_facilities, fetch_first_page
 from travel.trips import add_health_profiles, update_health_profiles, delete_health_profiles
 from langchain_core.runnables import RunnableConfig
-from langchain_core.messages import AIMessage, ToolMessage
-from typing import cast
+from langchain_core.messages import AIMessage, ToolMessage, BaseMessage, message_chunk_to_message
+from typing import cast, Any, Dict, List
 from langchain_core.tools import tool
+from copilotkit.langgraph import copilotkit_emit_message
+from travel.cache import get_response_cache, cacheable_question, mentions_profile_data
+from travel.intents import intent_recognizer, intent_fast_path_enabled
+from travel.admission import is_degraded
+from travel.speculative import QueriesParser, speculative_searches, speculative_search_enabled
+from travel.metrics import LLM_DURATION, LLM_TOKENS, RESPONSE_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
 
 @tool
 def select_health_profile(profile_id: str):
     """Select a child's health profile"""
     return f"Selected health profile {profile_id}"
 
-llm = ChatOpenAI(model="gpt-4o")
+LLM_MODEL = "gpt-4o"
+# Streamed responses only carry token usage when it is asked for, and the token metrics read it
+llm = ChatOpenAI(model=LLM_MODEL, stream_usage=True)
 tools = [search_for_healthcare_facilities, select_health_profile]
 
-async def chat_node(state: AgentState, config: RunnableConfig):
-    """Handle chat operations"""
-    llm_with_tools = llm.bind_tools(
-        [
-            *tools,
-            add_health_profiles,
-            update_health_profiles,
-            delete_health_profiles,
-            select_health_profile,
-        ],
-        parallel_tool_calls=False,
-    )
-
-    system_message = f"""
+SYSTEM_PROMPT = """
     You are "Our Kidz" healthcare assistant, designed to help parents with their children's healthcare needs.
 
     You can help parents by:
@@ -53,28 +53,56 @@ async def chat_node(state: AgentState, config: RunnableConfig):
     urgent care centers, hospitals, pharmacies, and other medical facilities.
 
     Unless the user specifies otherwise, only use the first 5 results from the search_for_healthcare_facilities tool.
+    When the user asks for more results of a previous search, call search_for_healthcare_facilities again with the same
+    queries and page "next" instead of starting a new search. Use page "previous" to go back.
 
     When you add or edit a health profile, you don't need to summarize what you added. Just give a high level summary
     of the profile and the healthcare facilities you found.
 
+    When a request needs several operations (for example adding profiles and searching for facilities), make all of the
+    tool calls in a single response instead of one per turn. Profile operations are applied before searches.
+
     When you create or update a health profile, you should set it as the selected profile.
     If you delete a profile, try to select another profile.
 
     If an operation is cancelled by the user, DO NOT try to perform the operation again. Just ask what the user would like to do now
     instead.
 
-    Current health profiles: {json.dumps(state.get('health_profiles', []))}
+    Current health profiles: {health_profiles}
     """
 
+# General questions that may be cached are answered without profile data, so the answer cannot depend on it
+GENERAL_SYSTEM_PROMPT = SYSTEM_PROMPT.format(
+    health_profiles="not shown for this question. Answer it as a general question that does not depend on any particular child."
+)
+# Cached answers are keyed on the prompt that produced them, so editing it invalidates them
+GENERAL_PROMPT_VERSION = hashlib.sha256(GENERAL_SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:16]
+
+async def chat_node(state: AgentState, config: RunnableConfig):
+    """Handle chat operations"""
+    # Mechanical commands are turned into tool calls without a round-trip to the LLM
+    if intent_fast_path_enabled():
+        fast_path_message = intent_recognizer(state)
+        if fast_path_message is not None:
+            return chat_response(state, fast_path_message)
+
+    llm_with_tools = llm.bind_tools(
+        [
+            *tools,
+            add_health_profiles,
+            update_health_profiles,
+            delete_health_profiles,
+            select_health_profile,
+        ],
+        parallel_tool_calls=True,
+    )
+
     # Validate and clean conversation history to prevent OpenAI tool call errors
     messages = state.get("messages", [])
     cleaned_messages = []
 
-    print(f"DEBUG: Processing {len(messages)} messages")
     for i, message in enumerate(messages):
-        print(f"DEBUG: Message {i}: {type(message).__name__}")
         if isinstance(message, AIMessage) and message.tool_calls:
-            print(f"DEBUG: AI message {i} has {len(message.tool_calls)} tool calls")
             # Check if this AI message with tool calls has corresponding tool responses
             has_all_tool_responses = True
             for tool_call in message.tool_calls:
@@ -90,43 +118,124 @@ async def chat_node(state: AgentState, config: RunnableConfig):
                         break
 
                 if not has_response:
-                    print(f"DEBUG: Tool call {tool_call_id} has no response")
+                    logger.debug("Tool call %s has no response", tool_call_id)
                     has_all_tool_responses = False
                     break
 
             if has_all_tool_responses:
                 cleaned_messages.append(message)
-                print(f"DEBUG: Including AI message {i} (all tool calls have responses)")
             else:
                 # Skip this AI message with tool calls that has no responses
                 # This prevents the OpenAI API error
-                print(f"DEBUG: Skipping AI message {i} with incomplete tool calls")
+                logger.debug("Skipping AI message %d with incomplete tool calls", i)
                 continue
         else:
             cleaned_messages.append(message)
-            print(f"DEBUG: Including message {i}")
 
-    print(f"DEBUG: Cleaned messages: {len(cleaned_messages)} (was {len(messages)})")
+    logger.debug("Cleaned messages: %d (was %d)", len(cleaned_messages), len(messages))
+
+    # Stateless general questions can be answered straight from the response cache
+    response_cache = get_response_cache()
+    question = cacheable_question(state, cleaned_messages) if response_cache else None
+    if question:
+        system_message = GENERAL_SYSTEM_PROMPT
+        # SQLite reads and commits block, so they stay off the event loop
+        cached_response = await asyncio.to_thread(response_cache.get, question, GENERAL_PROMPT_VERSION)
+        RESPONSE_CACHE_LOOKUPS.inc("miss" if cached_response is None else "hit")
+        if cached_response is not None:
+            await copilotkit_emit_message(config, cached_response)
+            return {
+                "messages": [AIMessage(content=cached_response)],
+                "selected_profile_id": state.get("selected_profile_id", None),
+                "health_profiles": state.get("health_profiles", [])
+            }
+    else:
+        system_message = SYSTEM_PROMPT.format(health_profiles=json.dumps(state.get('health_profiles', [])))
 
     # calling ainvoke instead of invoke is essential to get streaming to work properly on tool calls.
-    response = await llm_with_tools.ainvoke(
-        [
-            SystemMessage(content=system_message),
-            *cleaned_messages
-        ],
-        config=config,
-    )
+    with LLM_DURATION.time(LLM_MODEL):
+        if speculative_search_enabled() and not is_degraded():
+            response = await stream_with_speculative_search(
+                llm_with_tools,
+                [
+                    SystemMessage(content=system_message),
+                    *cleaned_messages
+                ],
+                config,
+            )
+        else:
+            response = await llm_with_tools.ainvoke(
+                [
+                    SystemMessage(content=system_message),
+                    *cleaned_messages
+                ],
+                config=config,
+            )
 
     ai_message = cast(AIMessage, response)
-
+    if ai_message.usage_metadata:
+        LLM_TOKENS.inc(LLM_MODEL, "input", amount=ai_message.usage_metadata.get("input_tokens", 0))
+        LLM_TOKENS.inc(LLM_MODEL, "output", amount=ai_message.usage_metadata.get("output_tokens", 0))
+
+    # question is only set for turns answered with the profile-free prompt, so cached answers cannot draw on profile data
+    if (
+        question
+        and not ai_message.tool_calls
+        and isinstance(ai_message.content, str)
+        and ai_message.content
+        and not mentions_profile_data(ai_message.content, state.get("health_profiles", []))
+    ):
+        await asyncio.to_thread(response_cache.set, question, GENERAL_PROMPT_VERSION, ai_message.content)
+
+    return chat_response(state, ai_message)
+
+async def stream_with_speculative_search(llm_with_tools: Any, messages: List[BaseMessage], config: RunnableConfig) -> AIMessage:
+    """
+    Stream the model's response, starting each facility search as soon as its query
+    string is complete in the streamed tool call arguments.
+    """
+    thread_id = config.get("configurable", {}).get("thread_id", "")
+    names: Dict[int, str] = {}
+    parsers: Dict[int, QueriesParser] = {}
+    response = None
+    try:
+        async for chunk in llm_with_tools.astream(messages, config=config):
+            response = chunk if response is None else response + chunk
+            for tool_call_chunk in getattr(chunk, "tool_call_chunks", []):
+                index = tool_call_chunk.get("index") or 0
+                if tool_call_chunk.get("name"):
+                    names[index] = tool_call_chunk["name"]
+                if names.get(index) != "search_for_healthcare_facilities":
+                    continue
+                parser = parsers.setdefault(index, QueriesParser())
+                for query in parser.feed(tool_call_chunk.get("args") or ""):
+                    speculative_searches.launch(thread_id, query, lambda query=query: fetch_first_page(query))
+    except BaseException:
+        speculative_searches.discard(thread_id)
+        raise
+
+    ai_message = message_chunk_to_message(response) if response is not None else AIMessage(content="")
+    # Searches the final arguments do not ask for are cancelled, the rest wait for the search node
+    speculative_searches.discard(thread_id, keep=[
+        query
+        for tool_call in ai_message.tool_calls if tool_call["name"] == "search_for_healthcare_facilities"
+        for query in tool_call["args"].get("queries", [])
+    ])
+    return cast(AIMessage, ai_message)
+
+def chat_response(state: AgentState, ai_message: AIMessage):
+    """Build the chat node's state update for an AI message."""
     if ai_message.tool_calls:
-        if ai_message.tool_calls[0]["name"] == "select_health_profile":
+        select_calls = [tool_call for tool_call in ai_message.tool_calls if tool_call["name"] == "select_health_profile"]
+        if select_calls:
+            # Selecting a profile only touches state, so it is answered right here. Any other
+            # tool calls from the same turn are left pending for the routing system.
             return {
-                "selected_profile_id": ai_message.tool_calls[0]["args"].get("profile_id", ""),
-                "messages": [ai_message, ToolMessage(
-                    tool_call_id=ai_message.tool_calls[0]["id"],
+                "selected_profile_id": select_calls[-1]["args"].get("profile_id", ""),
+                "messages": [ai_message, *[ToolMessage(
+                    tool_call_id=tool_call["id"],
                     content="Health profile selected."
-                )]
+                ) for tool_call in select_calls]]
             }
         else:
             # For other tool calls (add_health_profiles, update_health_profiles, delete_health_profiles, search_for_healthcare_facilities),
@@ -139,7 +248,7 @@ async def chat_node(state: AgentState, config: RunnableConfig):
             }
 
     return {
-        "messages": [response],
+        "messages": [ai_message],
         "selected_profile_id": state.get("selected_profile_id", None),
         "health_profiles": state.get("health_profiles", [])
     }
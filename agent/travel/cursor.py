@@ -0,0 +1,133 @@
+"""
+Server-side cursors for paging through facility search results.
+
+A cursor belongs to one (thread, normalized query) pair. Pages come from a generator
+that follows the Places API nextPageToken and only fetches when a page past the
+cached ones is asked for, so "show me more" goes straight to the next page and paging
+back is served from the pages already fetched.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from travel.cache import normalize_question
+
+logger = logging.getLogger(__name__)
+
+PAGE_DIRECTIONS = ("first", "next", "previous")
+
+# Fetches one page for a page token (None for the first page) and returns it with the next page token
+PageFetcher = Callable[[Optional[str]], tuple[List[Dict[str, Any]], Optional[str]]]
+
+class SearchCursor:
+    """Lazily fetched, cached pages of results for one search query."""
+
+    def __init__(self, query: str, fetch_page: PageFetcher):
+        self.query = query
+        self.pages: List[List[Dict[str, Any]]] = []
+        self.page_tokens: List[Optional[str]] = []
+        self.next_page_token: Optional[str] = None
+        self.position = -1
+        self.created_at = time.time()
+        self._fetch_page = fetch_page
+        self._source = self._fetch_pages(None)
+        # Reentrant so move can hold it around page; tool calls with the same query share the cursor
+        self._lock = threading.RLock()
+
+    def _fetch_pages(self, page_token: Optional[str]) -> Iterator[List[Dict[str, Any]]]:
+        while True:
+            facilities, self.next_page_token = self._fetch_page(page_token)
+            self.page_tokens.append(page_token)
+            yield facilities
+            if not self.next_page_token:
+                return
+            page_token = self.next_page_token
+
+    @property
+    def has_more(self) -> bool:
+        """Whether there are pages past the cached ones."""
+        return not self.pages or self.next_page_token is not None
+
+    @property
+    def has_next(self) -> bool:
+        """Whether there is a page after the current one, cached or not."""
+        return self.position + 1 < len(self.pages) or self.has_more
+
+    def seed(self, facilities: List[Dict[str, Any]], next_page_token: Optional[str]) -> bool:
+        """Adopt a first page fetched elsewhere. Returns False if the cursor already has one."""
+        with self._lock:
+            if self.pages:
+                return False
+            self.pages.append(facilities)
+            self.page_tokens.append(None)
+            self.next_page_token = next_page_token
+            self._source = self._fetch_pages(next_page_token)
+            return True
+
+    def page(self, number: int, fetch: bool = True) -> Optional[List[Dict[str, Any]]]:
+        """Return a page by number, fetching pages up to it if needed. None if there is no such page."""
+        with self._lock:
+            while len(self.pages) <= number:
+                if not fetch or not self.has_more:
+                    return None
+                try:
+                    self.pages.append(next(self._source))
+                except StopIteration:
+                    return None
+                except Exception:
+                    # A generator that raised is finished, so the next attempt resumes at the failed page
+                    self._source = self._fetch_pages(self.next_page_token if self.pages else None)
+                    raise
+            return self.pages[number]
+
+    def move(self, direction: str, fetch: bool = True) -> Optional[List[Dict[str, Any]]]:
+        """
+        Move to the first, next or previous page and return it. The position only
+        changes when the page exists, so there is no page before the first one. With
+        fetch=False only cached pages are served, and the call never waits: while another
+        thread holds the cursor for a fetch it returns None, as if the page were not cached.
+        """
+        if direction not in PAGE_DIRECTIONS:
+            raise ValueError(f"Unknown page '{direction}', expected one of {', '.join(PAGE_DIRECTIONS)}")
+        if not self._lock.acquire(blocking=fetch):
+            return None
+        try:
+            if direction == "previous" and self.position <= 0:
+                return None
+            target = {"first": 0, "next": self.position + 1, "previous": self.position - 1}[direction]
+            facilities = self.page(target, fetch=fetch)
+            if facilities is not None:
+                self.position = target
+            return facilities
+        finally:
+            self._lock.release()
+
+class SearchCursors:
+    """Cursors per (thread, normalized query), evicted when least recently used or expired."""
+
+    def __init__(self, ttl_seconds: float = 900, max_entries: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._cursors: OrderedDict[tuple[str, str], SearchCursor] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, thread_id: str, query: str, fetch_page: PageFetcher) -> SearchCursor:
+        """Return the live cursor for a thread and query, creating one if there is none."""
+        key = (thread_id, normalize_question(query))
+        with self._lock:
+            cursor = self._cursors.get(key)
+            # Page tokens expire upstream, so old cursors start over
+            if cursor is None or time.time() - cursor.created_at > self.ttl_seconds:
+                cursor = self._cursors[key] = SearchCursor(query, fetch_page)
+            self._cursors.move_to_end(key)
+            while len(self._cursors) > self.max_entries:
+                self._cursors.popitem(last=False)
+            return cursor
+
+search_cursors = SearchCursors(
+    ttl_seconds=float(os.getenv("SEARCH_CURSOR_TTL_SECONDS", "900")),
+    max_entries=int(os.getenv("SEARCH_CURSOR_MAX_ENTRIES", "1000")),
+)
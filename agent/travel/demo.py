@@ -1,19 +1,38 @@
 """Server"""
 
 import os
+import hmac
+from typing import Optional
 from dotenv import load_dotenv
 load_dotenv() # pylint: disable=wrong-import-position
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends, Header, HTTPException
+from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from copilotkit.integrations.fastapi import add_fastapi_endpoint
 from copilotkit import CopilotKitRemoteEndpoint, LangGraphAgent
 from travel.agent import graph
+from travel.log import configure_logging, RequestContextMiddleware
+from travel.metrics import registry
+from travel.profiler import profiler, ProfilerRequestMiddleware
+from travel.admission import AdmissionMiddleware
+from travel.keys import get_key_pool
+from travel.refresh import refresh_stored_facilities, REFRESH_CONCURRENCY, REFRESH_REQUESTS_PER_SECOND
 
+configure_logging()
+
+# Read the key pool now so a malformed GOOGLE_MAPS_API_KEYS stops the server at startup
+get_key_pool()
 
 app = FastAPI()
 
+# Starlette runs the last added middleware first, so request ids are assigned before admission control
+app.add_middleware(AdmissionMiddleware, path_prefix="/copilotkit")
+app.add_middleware(ProfilerRequestMiddleware)
+app.add_middleware(RequestContextMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -34,6 +53,66 @@ sdk = CopilotKitRemoteEndpoint(
 
 add_fastapi_endpoint(app, sdk, "/copilotkit")
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus metrics for graph nodes, the chat model and Google API calls."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+def require_admin(authorization: Optional[str] = Header(default=None)):
+    """Allow only callers presenting ADMIN_TOKEN. Without a token the admin routes do not exist."""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=404)
+    if not authorization or not hmac.compare_digest(authorization, f"Bearer {admin_token}"):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+class ProfileRequest(BaseModel):
+    """Bounds and filter for an on-demand profile."""
+    seconds: Optional[float] = 30
+    requests: Optional[int] = None
+    thread_id: Optional[int] = None
+    interval_ms: float = 10
+
+@app.post("/admin/profile", dependencies=[Depends(require_admin)])
+async def start_profile(request: ProfileRequest):
+    """Start sampling stacks and event-loop lag for a bounded window or number of requests."""
+    try:
+        profiler.start(seconds=request.seconds, requests=request.requests, thread_id=request.thread_id, interval_ms=request.interval_ms)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    return profiler.status()
+
+@app.get("/admin/profile", dependencies=[Depends(require_admin)])
+def profile_status():
+    """The running profile, the reports of the last one and the threads that can be filtered on."""
+    return profiler.status()
+
+@app.delete("/admin/profile", dependencies=[Depends(require_admin)])
+def stop_profile():
+    """Stop the running profile early and return its reports."""
+    return {"last_result": profiler.stop()}
+
+class RefreshRequest(BaseModel):
+    """Limits for a batch facility refresh."""
+    concurrency: int = REFRESH_CONCURRENCY
+    requests_per_second: float = REFRESH_REQUESTS_PER_SECOND
+    refresh_emergency: bool = True
+
+@app.post("/admin/refresh-facilities", dependencies=[Depends(require_admin)])
+async def refresh_facilities(request: RefreshRequest):
+    """Re-fetch every facility saved on any profile and write the updates back."""
+    return await refresh_stored_facilities(
+        graph,
+        concurrency=max(1, request.concurrency),
+        requests_per_second=request.requests_per_second,
+        refresh_emergency=request.refresh_emergency,
+    )
+
+@app.get("/admin/keys", dependencies=[Depends(require_admin)])
+def api_keys():
+    """Usage and parking state of each Google API key in the pool, with the keys masked."""
+    return get_key_pool().stats()
+
 def main():
     """Run the uvicorn server."""
     port = int(os.getenv("PORT", "8000"))
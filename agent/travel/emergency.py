@@ -0,0 +1,234 @@
+"""
+Emergency fast lane.
+
+Messages that signal an emergency get the 911 guidance and the nearest emergency rooms
+and urgent cares for the selected profile straight away, before the normal LLM turn runs.
+The nearest facilities come from a per-profile list that is refreshed in the background,
+so answering never waits on the network. Lists are warmed whenever a turn starts and
+whenever profiles are added or updated. If an emergency comes in while a profile's first
+list is still being fetched, the guidance goes out right away and the nearest facilities
+follow in a second message once they arrive.
+"""
+
+import os
+import re
+import asyncio
+import math
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Iterable
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
+from copilotkit.langgraph import copilotkit_emit_message
+from travel.state import AgentState, HealthProfile
+from travel.search import search_healthcare_facilities_api
+
+logger = logging.getLogger(__name__)
+
+# Who the message is about: a pronoun or a child, optionally with a few words in between ("my 2 year old son")
+EMERGENCY_SUBJECT = (
+    r"(?:he|she|they|we|i|(?:my|our|the)\s+(?:[\w-]+\s+){0,3}?"
+    r"(?:child|kid|son|daughter|baby|toddler|boy|girl|infant|newborn|brother|sister))"
+)
+
+# Conditions happening right now, each following the subject directly or after "is", "'s", "just" and the like
+EMERGENCY_STATES = (
+    r"(?:not breathing|stopped breathing|can'?t breathe|cannot breathe|having trouble breathing|struggling to breathe"
+    r"|choking|unconscious|unresponsive|passed out|not waking up|won'?t wake up|having a seizure|seizing|convulsing"
+    r"|turning blue|bleeding (?:heavily|badly|a lot)|not stopping bleeding|won'?t stop bleeding"
+    r"|having (?:an? )?(?:anaphyla\w*|severe allergic reaction)|drowning|overdosing|(?:been )?poisoned"
+    r"|(?:badly|seriously) (?:burned|hurt)"
+    r"|(?:swallowed|ate|drank)\s+(?:a |an |some |the )?(?:[\w-]+ ){0,2}?(?:batter(?:y|ies)|magnets?|pills?|medicine|bleach|detergent|poison|[\w-]+ pods?))"
+)
+
+EMERGENCY_LINKS = r"(?:'s|'re|'m|\s+(?:is|are|am|just|suddenly|still|been|has|have))*"
+
+# Explicit declarations that need no subject. A bare "help" or "911" is not one.
+EMERGENCY_DECLARATIONS = re.compile(
+    r"\b(?:this is|it'?s) an? (?:medical )?emergency\b|\b(?:i|we) (?:have|need help with) an? (?:medical )?emergency\b"
+    r"|\b(?:i|we) need an ambulance\b",
+    re.IGNORECASE,
+)
+
+# Questions about prevention or hypotheticals are not emergencies even when they describe one
+NON_EMERGENCY_FRAMINGS = re.compile(
+    r"\b(?:how (?:do|can|should|would) (?:i|we|you) (?:prevent|avoid|stop)|what (?:should (?:i|we)|to) do if|in case|what happens if|what if)\b",
+    re.IGNORECASE,
+)
+
+EMERGENCY_GUIDANCE = (
+    "If this is a medical emergency, call 911 now (or your local emergency number). "
+    "For a possible poisoning, call Poison Control at 1-800-222-1222. "
+    "Do not wait for an online answer if your child is in danger."
+)
+
+EMERGENCY_QUERIES = [("emergency room hospital", "hospital"), ("urgent care", "urgent_care")]
+
+# How long an emergency reply waits for a profile's first list before sending the guidance alone
+FIRST_LIST_WAIT_SECONDS = float(os.getenv("EMERGENCY_FIRST_LIST_WAIT_SECONDS", "5"))
+# How long a precomputed list of emergency facilities stays fresh
+REFRESH_INTERVAL_SECONDS = float(os.getenv("EMERGENCY_REFRESH_SECONDS", "21600"))
+MAX_EMERGENCY_FACILITIES = 3
+# A precomputed list stays usable while the profile's map center moves less than this
+MAX_DRIFT_KM = 5
+
+def emergency_pattern(child_names: Iterable[str] = ()) -> re.Pattern:
+    """The present-tense emergency pattern, with the profiles' child names as extra subjects."""
+    names = "".join(f"|{re.escape(name)}" for name in child_names if name)
+    return re.compile(rf"\b(?:{EMERGENCY_SUBJECT}{names}){EMERGENCY_LINKS}\s+{EMERGENCY_STATES}\b", re.IGNORECASE)
+
+def is_emergency(text: str, child_names: Iterable[str] = ()) -> bool:
+    """
+    Whether a user message reports an emergency happening now. Keywords alone are not
+    enough: the message has to say someone is in that state ("he's not breathing", "my
+    son swallowed a battery") or declare an emergency, and must not be about prevention.
+    """
+    # Phone keyboards type curly apostrophes ("she’s", "can’t")
+    text = text.replace("’", "'")
+    if NON_EMERGENCY_FRAMINGS.search(text):
+        return False
+    return bool(EMERGENCY_DECLARATIONS.search(text) or emergency_pattern(child_names).search(text))
+
+def distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in kilometers."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 6371 * 2 * math.asin(math.sqrt(a))
+
+class EmergencyFacilityIndex:
+    """Per-profile lists of the nearest emergency rooms and urgent cares, refreshed in the background."""
+
+    def __init__(self, refresh_interval_seconds: float = REFRESH_INTERVAL_SECONDS):
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="emergency-refresh")
+
+    @staticmethod
+    def _profile_location(profile: HealthProfile) -> Optional[tuple[float, float]]:
+        if profile.get("center_latitude") is None or profile.get("center_longitude") is None:
+            return None
+        return (profile["center_latitude"], profile["center_longitude"])
+
+    @staticmethod
+    def _near(entry: Dict[str, Any], location: tuple[float, float]) -> bool:
+        return distance_km(*entry["location"], *location) <= MAX_DRIFT_KM
+
+    def lookup(self, profile: HealthProfile) -> Optional[List[Dict[str, Any]]]:
+        """Return the precomputed facilities for a profile if they are still near its current location."""
+        location = self._profile_location(profile)
+        with self._lock:
+            entry = self._entries.get(profile["id"])
+        if entry is None or location is None or not self._near(entry, location):
+            return None
+        return entry["facilities"]
+
+    def schedule_refresh(self, profile: HealthProfile):
+        """Refresh a profile's list in the background if it is missing, stale or for an old location."""
+        location = self._profile_location(profile)
+        if location is None:
+            return
+        with self._lock:
+            entry = self._entries.get(profile["id"])
+            fresh = (
+                entry is not None
+                and self._near(entry, location)
+                and time.time() - entry["fetched_at"] < self.refresh_interval_seconds
+            )
+            if fresh or profile["id"] in self._in_flight:
+                return
+            self._in_flight[profile["id"]] = self._executor.submit(self._refresh, profile["id"], location)
+
+    def in_flight(self, profile: HealthProfile) -> Optional[Future]:
+        """The running refresh of a profile's list, if there is one."""
+        with self._lock:
+            return self._in_flight.get(profile["id"])
+
+    def _refresh(self, profile_id: str, location: tuple[float, float]):
+        try:
+            facilities = []
+            for query, facility_type in EMERGENCY_QUERIES:
+                try:
+                    for facility in search_healthcare_facilities_api(query, location_bias=location):
+                        facilities.append({
+                            **facility,
+                            "facility_type": facility_type,
+                            "distance_km": distance_km(location[0], location[1], facility["latitude"], facility["longitude"]),
+                        })
+                except Exception as e:
+                    logger.error(f"Failed to refresh emergency facilities for profile '{profile_id}' with query '{query}': {e}")
+
+            # Keep what we had if every query failed
+            if not facilities:
+                return
+
+            facilities.sort(key=lambda f: f["distance_km"])
+            with self._lock:
+                self._entries[profile_id] = {
+                    "location": location,
+                    "facilities": facilities[:MAX_EMERGENCY_FACILITIES],
+                    "fetched_at": time.time(),
+                }
+            logger.info(f"Refreshed {min(len(facilities), MAX_EMERGENCY_FACILITIES)} emergency facilities for profile '{profile_id}'")
+        finally:
+            with self._lock:
+                self._in_flight.pop(profile_id, None)
+
+emergency_index = EmergencyFacilityIndex()
+
+def format_emergency_facilities(facilities: List[Dict[str, Any]]) -> str:
+    """List the nearest emergency facilities."""
+    lines = ["Nearest emergency care:"]
+    for facility in facilities:
+        details = f"{facility['name']} ({facility['distance_km'] * 0.621371:.1f} mi) - {facility['address']}"
+        if facility.get("phone"):
+            details += f", {facility['phone']}"
+        lines.append(f"- {details}")
+    return "\n".join(lines)
+
+def format_emergency_message(facilities: Optional[List[Dict[str, Any]]]) -> str:
+    """Build the immediate emergency response."""
+    if not facilities:
+        return EMERGENCY_GUIDANCE
+    return f"{EMERGENCY_GUIDANCE}\n\n{format_emergency_facilities(facilities)}"
+
+async def emergency_node(state: AgentState, config: RunnableConfig):
+    """
+    Graph entry point that answers emergencies immediately and keeps the
+    emergency facility lists warm for every profile.
+    """
+    health_profiles = state.get("health_profiles", []) or []
+    for profile in health_profiles:
+        emergency_index.schedule_refresh(profile)
+
+    messages = state.get("messages", [])
+    if not messages or not isinstance(messages[-1], HumanMessage) or not isinstance(messages[-1].content, str):
+        return {}
+    if not is_emergency(messages[-1].content, [profile.get("child_name", "") for profile in health_profiles]):
+        return {}
+
+    selected_profile = next((p for p in health_profiles if p["id"] == state.get("selected_profile_id")), None)
+    facilities = emergency_index.lookup(selected_profile) if selected_profile else None
+    content = format_emergency_message(facilities)
+    logger.warning(f"Emergency detected, answering with {len(facilities or [])} precomputed facilities")
+
+    await copilotkit_emit_message(config, content)
+    replies = [AIMessage(content=content)]
+
+    # After a restart or for a new profile the first list may still be on its way
+    refresh = emergency_index.in_flight(selected_profile) if selected_profile and facilities is None else None
+    if refresh is not None:
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(refresh)), FIRST_LIST_WAIT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Emergency facilities did not arrive in time: {e!r}")
+        facilities = emergency_index.lookup(selected_profile)
+        if facilities:
+            content = format_emergency_facilities(facilities)
+            await copilotkit_emit_message(config, content)
+            replies.append(AIMessage(content=content))
+
+    return {"messages": replies}
@@ -0,0 +1,272 @@
+"""
+Offline stand-ins for the chat model and the Google Maps endpoints.
+
+These let the benchmark harness drive the real graph without network access: a
+scriptable chat model that plays the role of gpt-4o, and a local HTTP server that
+mimics the Places API (New) text search, the legacy Places text search and the
+Geocoding API with configurable latency and error rates.
+"""
+
+import re
+import json
+import time
+import uuid
+import random
+import asyncio
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncIterator, Callable, List, Optional
+from urllib.parse import urlparse, parse_qs
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+def default_script(messages: List[BaseMessage]) -> AIMessage:
+    """
+    Answer like the real model would for a typical turn: a user message that mentions
+    a facility type triggers a search, tool responses get a short summary, anything
+    else gets a plain answer.
+    """
+    last_message = messages[-1]
+    if isinstance(last_message, ToolMessage):
+        return AIMessage(content="Here is what I found. I am not a substitute for professional medical advice.")
+
+    text = last_message.content if isinstance(last_message, HumanMessage) and isinstance(last_message.content, str) else ""
+    if any(term in text.lower() for term in ("find", "search", "near", "pediatrician", "pharmacy", "urgent care")):
+        return AIMessage(content="", tool_calls=[{
+            "name": "search_for_healthcare_facilities",
+            "args": {"queries": [text]},
+            "id": f"call_{uuid.uuid4().hex[:24]}",
+            "type": "tool_call",
+        }])
+
+    return AIMessage(content="For a fever in a toddler, call your pediatrician if it lasts more than 3 days. Call 911 in an emergency.")
+
+class ScriptedChatModel(BaseChatModel):
+    """A chat model whose replies come from a script function, with simulated generation latency."""
+
+    script: Callable[[List[BaseMessage]], AIMessage] = default_script
+    latency_seconds: float = 0.0
+    input_tokens_per_message: int = 50
+    output_tokens: int = 40
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any):  # pylint: disable=unused-argument
+        return self
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        message = self.script(messages)
+        message.usage_metadata = {
+            "input_tokens": self.input_tokens_per_message * len(messages),
+            "output_tokens": self.output_tokens,
+            "total_tokens": self.input_tokens_per_message * len(messages) + self.output_tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency_seconds)
+        return self._respond(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency_seconds)
+        return self._respond(messages)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        # The reply is cut into pieces and the latency spread over them, like a real token stream
+        message = self._respond(messages).generations[0].message
+        pieces = [AIMessageChunk(content=word) for word in re.findall(r"\S+\s*", message.content)]
+        for index, tool_call in enumerate(message.tool_calls):
+            args = json.dumps(tool_call["args"])
+            pieces.append(AIMessageChunk(content="", tool_call_chunks=[{"name": tool_call["name"], "args": "", "id": tool_call["id"], "index": index}]))
+            pieces.extend(
+                AIMessageChunk(content="", tool_call_chunks=[{"name": None, "args": args[start:start + 8], "id": None, "index": index}])
+                for start in range(0, len(args), 8)
+            )
+        pieces = pieces or [AIMessageChunk(content="")]
+        pieces[-1].usage_metadata = message.usage_metadata
+        for piece in pieces:
+            await asyncio.sleep(self.latency_seconds / len(pieces))
+            chunk = ChatGenerationChunk(message=piece)
+            if run_manager:
+                await run_manager.on_llm_new_token(piece.content, chunk=chunk)
+            yield chunk
+
+# Like Google, the stand-in serves at most three pages of results per query
+FAKE_PAGE_LIMIT = 3
+
+def fake_places(query: str, count: int = 5, offset: int = 0) -> List[dict]:
+    """Deterministic Places API (New) results for a query, starting at a result offset."""
+    seed = int(hashlib.sha256(query.encode("utf-8")).hexdigest()[:8], 16)
+    base_lat, base_lng = 40.70 + (seed % 100) / 1000, -74.00 + (seed % 37) / 1000
+    return [
+        {
+            "id": f"fake-{seed % 100000}-{i}",
+            "displayName": {"text": f"Fake Pediatric Clinic {seed % 1000}-{i}", "languageCode": "en"},
+            "formattedAddress": f"{100 + i} Benchmark Ave, New York, NY 10001",
+            "location": {"latitude": base_lat + i * 0.002, "longitude": base_lng - i * 0.002},
+            "rating": 3.5 + (i % 3) * 0.5,
+            "types": ["doctor", "health", "point_of_interest"],
+            "nationalPhoneNumber": f"(212) 555-01{i:02d}",
+            "regularOpeningHours": {"weekdayDescriptions": ["Monday: 8:00 AM - 6:00 PM", "Tuesday: 8:00 AM - 6:00 PM"]},
+        }
+        for i in range(offset, offset + count)
+    ]
+
+def fake_place_details(place_id: str) -> dict:
+    """Deterministic Place Details for a place id."""
+    seed = int(hashlib.sha256(place_id.encode("utf-8")).hexdigest()[:8], 16)
+    return {
+        "id": place_id,
+        "displayName": {"text": f"Fake Pediatric Clinic {seed % 1000}", "languageCode": "en"},
+        "formattedAddress": f"{100 + seed % 900} Benchmark Ave, New York, NY 10001",
+        "location": {"latitude": 40.70 + (seed % 100) / 1000, "longitude": -74.00 + (seed % 37) / 1000},
+        "rating": 3.0 + (seed % 5) * 0.5,
+        "types": ["doctor", "health", "point_of_interest"],
+        "nationalPhoneNumber": f"(212) 555-{seed % 10000:04d}",
+        "regularOpeningHours": {"weekdayDescriptions": ["Monday: 9:00 AM - 5:00 PM", "Tuesday: 9:00 AM - 5:00 PM"]},
+        "businessStatus": "OPERATIONAL",
+    }
+
+def apply_field_mask(response: dict, field_mask: str) -> dict:
+    """Keep only the fields a searchText X-Goog-FieldMask asks for, as Google does."""
+    fields = [field.strip() for field in field_mask.split(",") if field.strip()]
+    if "*" in fields:
+        return response
+    place_fields = {field[len("places."):].split(".")[0] for field in fields if field.startswith("places.")}
+    masked = {key: value for key, value in response.items() if key in fields}
+    if "places" in response and place_fields:
+        masked["places"] = [{key: value for key, value in place.items() if key in place_fields} for place in response["places"]]
+    return masked
+
+class FakePlacesServer:
+    """
+    A local HTTP server that mimics the Google endpoints used by the search node.
+
+    latency_seconds is added to every response and error_rate is the probability
+    of answering with a 500 instead of results. Requests made with one of
+    throttled_keys are answered as over quota.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0, error_rate: float = 0.0, throttled_keys: tuple = (), host: str = "127.0.0.1", port: int = 0):
+        self.latency_seconds = latency_seconds
+        self.error_rate = error_rate
+        self.throttled_keys = set(throttled_keys)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakePlacesServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-places-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakePlacesServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            failed = random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return failed
+
+    def _handler_class(self):
+        fake_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                pass
+
+            def _send_json(self, status: int, payload: Any):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _respond(self, build: Callable[[], Any], legacy: bool = False):
+                time.sleep(fake_server.latency_seconds)
+                api_key = self.headers.get("X-Goog-Api-Key") or parse_qs(urlparse(self.path).query).get("key", [""])[0]
+                if api_key in fake_server.throttled_keys:
+                    if legacy:
+                        self._send_json(200, {"status": "OVER_QUERY_LIMIT", "error_message": "Injected quota exhaustion", "results": []})
+                    else:
+                        self._send_json(429, {"error": {"code": 429, "message": "Injected quota exhaustion", "status": "RESOURCE_EXHAUSTED"}})
+                elif not fake_server._should_fail():
+                    self._send_json(200, build())
+                elif legacy:
+                    # The googlemaps client retries 5xx responses with backoff, so legacy
+                    # endpoints fail the way a denied request does instead
+                    self._send_json(200, {"status": "REQUEST_DENIED", "error_message": "Injected failure", "results": []})
+                else:
+                    self._send_json(500, {"error": {"code": 500, "message": "Injected failure", "status": "INTERNAL"}})
+
+            def do_POST(self):  # pylint: disable=invalid-name
+                path = urlparse(self.path).path
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if path == "/v1/places:searchText":
+                    count = body.get("pageSize", body.get("maxResultCount", 5))
+                    page = int(body.get("pageToken", "page-0").split("-")[-1])
+                    field_mask = self.headers.get("X-Goog-FieldMask", "")
+
+                    def search_page():
+                        result = {"places": fake_places(body.get("textQuery", ""), count, offset=page * count)}
+                        if page + 1 < FAKE_PAGE_LIMIT:
+                            result["nextPageToken"] = f"page-{page + 1}"
+                        return apply_field_mask(result, field_mask)
+
+                    self._respond(search_page)
+                else:
+                    self._send_json(404, {"error": {"code": 404, "message": f"Unknown path {path}"}})
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query).get("query", parse_qs(parsed.query).get("address", [""]))[0]
+                if parsed.path == "/maps/api/place/textsearch/json":
+                    self._respond(lambda: {"status": "OK", "results": [
+                        {
+                            "place_id": place["id"],
+                            "name": place["displayName"]["text"],
+                            "formatted_address": place["formattedAddress"],
+                            "geometry": {"location": {"lat": place["location"]["latitude"], "lng": place["location"]["longitude"]}},
+                            "rating": place["rating"],
+                        }
+                        for place in fake_places(query)
+                    ]}, legacy=True)
+                elif parsed.path.startswith("/v1/places/"):
+                    self._respond(lambda: fake_place_details(parsed.path[len("/v1/places/"):]))
+                elif parsed.path == "/maps/api/geocode/json":
+                    self._respond(lambda: {"status": "OK", "results": [
+                        {
+                            "place_id": place["id"],
+                            "formatted_address": place["formattedAddress"],
+                            "geometry": {"location": {"lat": place["location"]["latitude"], "lng": place["location"]["longitude"]}},
+                        }
+                        for place in fake_places(query, 1)
+                    ]}, legacy=True)
+                else:
+                    self._send_json(404, {"error": {"code": 404, "message": f"Unknown path {parsed.path}"}})
+
+        return Handler
@@ -0,0 +1,140 @@
+"""
+Deterministic intent recognizer for mechanical commands.
+
+Simple commands such as "select Emma's profile", "delete the Leo profile" or
+"find pharmacies near 10001" are matched with rules before the LLM is called. A
+high-confidence match is turned into the same tool call the model would have made,
+anything else falls through to the LLM.
+"""
+
+import os
+import re
+import uuid
+import logging
+from typing import Optional, List
+from langchain_core.messages import AIMessage, HumanMessage
+from travel.state import AgentState, HealthProfile
+from travel.metrics import INTENT_FAST_PATH
+
+logger = logging.getLogger(__name__)
+
+# Facility nouns only: adjectives like "health" or "medical" also describe food stores and supply shops
+FACILITY_TERMS = [
+    "pediatrician", "doctor", "hospital", "clinic", "urgent care", "emergency room",
+    "pharmacy", "pharmacies", "dentist", "health center", "medical center", "medical office",
+]
+
+# Words that turn a facility noun into something that is not a children's healthcare facility
+NON_MEDICAL_TOKENS = {
+    "pet", "pets", "vet", "vets", "veterinary", "animal", "dog", "cat", "food", "store", "stores",
+    "shop", "shops", "supply", "supplies", "insurance", "spa", "gym", "tire", "law", "legal",
+}
+
+# Words that make a location depend on context the recognizer does not have
+VAGUE_LOCATION_TOKENS = {"me", "us", "here", "there", "home", "my", "our", "nearby", "current", "location"}
+
+# Words that mean the command carries more than a place, such as filters or urgency
+NON_PLACE_TOKENS = {
+    "that", "which", "who", "with", "without", "take", "takes", "accept", "accepts", "open", "now",
+    "today", "tonight", "please", "quickly", "asap", "and", "or", "for", "but",
+}
+
+ZIP_CODE = re.compile(r"^\d{5}(?:-\d{4})?$")
+PLACE_NAME = re.compile(r"^[a-z][a-z'.-]*(?:,?\s+[a-z][a-z'.-]*){0,3}$")
+
+SELECT_PATTERNS = [
+    re.compile(r"^(?:please\s+)?(?:select|switch\s+to|open|use)\s+(?:the\s+)?(?P<name>[\w\s'-]+?)(?:'s)?\s+(?:health\s+)?profile$"),
+    re.compile(r"^(?:please\s+)?(?:select|switch\s+to|open|use)\s+(?:the\s+)?(?:health\s+)?profile\s+(?:for\s+|of\s+)?(?P<name>[\w\s'-]+?)$"),
+]
+
+DELETE_PATTERNS = [
+    re.compile(r"^(?:please\s+)?(?:delete|remove)\s+(?:the\s+)?(?P<name>[\w\s'-]+?)(?:'s)?\s+(?:health\s+)?profile$"),
+    re.compile(r"^(?:please\s+)?(?:delete|remove)\s+(?:the\s+)?(?:health\s+)?profile\s+(?:for\s+|of\s+)?(?P<name>[\w\s'-]+?)$"),
+]
+
+SEARCH_PATTERNS = [
+    re.compile(r"^(?:please\s+)?(?:find|search\s+for|look\s+for|locate|show\s+me)\s+(?:some\s+|the\s+)?(?P<what>[\w\s'-]+?)\s+(?P<preposition>near|in|around)\s+(?P<where>[\w\s,.'-]+?)$"),
+]
+
+def intent_fast_path_enabled() -> bool:
+    """Whether the fast path is on. It is enabled unless turned off in the environment."""
+    return os.getenv("INTENT_FAST_PATH_ENABLED", "true").lower() not in ("0", "false", "no")
+
+def _normalize_command(text: str) -> str:
+    text = text.strip().lower().replace("’", "'")
+    text = re.sub(r"[.!?]+$", "", text)
+    return " ".join(text.split())
+
+def _is_specific_location(where: str) -> bool:
+    """Accept only a ZIP code or a short place name without vague or extra words."""
+    if ZIP_CODE.match(where):
+        return True
+    if not PLACE_NAME.match(where):
+        return False
+    tokens = set(re.findall(r"[a-z']+", where))
+    return not tokens & (VAGUE_LOCATION_TOKENS | NON_PLACE_TOKENS)
+
+def _is_facility(what: str) -> bool:
+    """Accept only searches for a healthcare facility noun without a non-medical qualifier."""
+    if set(re.findall(r"[a-z']+", what)) & NON_MEDICAL_TOKENS:
+        return False
+    return any(re.search(rf"\b{term}s?\b", what) for term in FACILITY_TERMS)
+
+def _find_profile(name: str, health_profiles: List[HealthProfile]) -> Optional[HealthProfile]:
+    """Resolve a name or id to exactly one profile, or None if it is missing or ambiguous."""
+    name = name.strip()
+    matches = [
+        profile for profile in health_profiles
+        if name in (str(profile.get("id", "")).lower(), str(profile.get("child_name", "")).lower())
+    ]
+    return matches[0] if len(matches) == 1 else None
+
+def _tool_call(name: str, args: dict) -> dict:
+    return {"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:24]}", "type": "tool_call"}
+
+class IntentRecognizer:
+    """Rule-based recognizer for commands that need no LLM call."""
+
+    def recognize(self, text: str, health_profiles: List[HealthProfile]) -> Optional[dict]:
+        """Return a tool call for a high-confidence command, or None."""
+        command = _normalize_command(text)
+
+        for pattern in SELECT_PATTERNS:
+            match = pattern.match(command)
+            if match:
+                profile = _find_profile(match.group("name"), health_profiles)
+                return _tool_call("select_health_profile", {"profile_id": profile["id"]}) if profile else None
+
+        for pattern in DELETE_PATTERNS:
+            match = pattern.match(command)
+            if match:
+                profile = _find_profile(match.group("name"), health_profiles)
+                return _tool_call("delete_health_profiles", {"profile_ids": [profile["id"]]}) if profile else None
+
+        for pattern in SEARCH_PATTERNS:
+            match = pattern.match(command)
+            if match:
+                what, where = match.group("what"), match.group("where").strip(" ,.")
+                if not _is_specific_location(where) or not _is_facility(what):
+                    return None
+                return _tool_call("search_for_healthcare_facilities", {"queries": [f"{what} {match.group('preposition')} {where}"]})
+
+        return None
+
+    def __call__(self, state: AgentState) -> Optional[AIMessage]:
+        """Build the AI message for the current turn if the latest user message is a known command."""
+        messages = state.get("messages", [])
+        if not messages or not isinstance(messages[-1], HumanMessage) or not isinstance(messages[-1].content, str):
+            return None
+
+        tool_call = self.recognize(messages[-1].content, state.get("health_profiles", []) or [])
+        # The hit rate is the share of hits in intent_fast_path_total on /metrics
+        INTENT_FAST_PATH.inc("hit" if tool_call else "miss")
+
+        if not tool_call:
+            return None
+
+        logger.info(f"Intent fast path matched {tool_call['name']}")
+        return AIMessage(content="", tool_calls=[tool_call])
+
+intent_recognizer = IntentRecognizer()
@@ -0,0 +1,143 @@
+"""
+A pool of Google Maps API keys for more aggregate quota.
+
+GOOGLE_MAPS_API_KEYS holds a comma-separated list of keys, each optionally followed by
+a weight (key:weight). Without it the pool is the single GOOGLE_MAPS_API_KEY. The pool
+is read from the environment once, the first time a key is needed.
+
+Calls are spread across the keys by smooth weighted round-robin. A key that is
+throttled or denied (403, 429, OVER_QUERY_LIMIT, REQUEST_DENIED) is parked for
+API_KEY_PARK_SECONDS and skipped until then. If every key is parked, the one
+throttled longest ago is used.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+from travel.metrics import API_KEY_REQUESTS, API_KEY_PARKED
+
+logger = logging.getLogger(__name__)
+
+THROTTLED_STATUSES = ("403", "429", "OVER_QUERY_LIMIT", "REQUEST_DENIED")
+
+def mask_key(key: str) -> str:
+    """A key shortened to its last four characters for logs and metrics."""
+    return f"...{key[-4:]}"
+
+def parse_weight(weight: str, key: str) -> int:
+    """The weight of a GOOGLE_MAPS_API_KEYS entry, 1 when it has none."""
+    if not weight.strip():
+        return 1
+    try:
+        value = int(weight)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise ValueError(f"Invalid weight '{weight.strip()}' for API key {mask_key(key.strip())} in GOOGLE_MAPS_API_KEYS, expected a positive integer")
+    return value
+
+class ApiKey:
+    """One API key with its weight, parking state and usage counters."""
+
+    def __init__(self, key: str, weight: int = 1):
+        self.key = key
+        self.weight = weight
+        self.label = mask_key(key)
+        self.current_weight = 0
+        self.parked_until = 0.0
+        self.last_throttled_at = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.client: Any = None
+
+    def is_parked(self, now: float) -> bool:
+        return now < self.parked_until
+
+class KeyPool:
+    """Spreads calls across API keys and parks the ones that get throttled."""
+
+    def __init__(self, keys: List[ApiKey], park_seconds: float = 60):
+        self.keys = keys
+        self.park_seconds = park_seconds
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "KeyPool":
+        """Build the pool from GOOGLE_MAPS_API_KEYS, falling back to GOOGLE_MAPS_API_KEY."""
+        keys = []
+        spec = os.getenv("GOOGLE_MAPS_API_KEYS") or os.getenv("GOOGLE_MAPS_API_KEY", "")
+        for entry in spec.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            key, _, weight = entry.partition(":")
+            keys.append(ApiKey(key.strip(), parse_weight(weight, key)))
+        return cls(keys, park_seconds=float(os.getenv("API_KEY_PARK_SECONDS", "60")))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def acquire(self, exclude: Optional[List[ApiKey]] = None) -> ApiKey:
+        """Pick the key for the next call, skipping parked keys and any in exclude."""
+        if not self.keys:
+            raise ValueError("GOOGLE_MAPS_API_KEY environment variable not set")
+        now = time.time()
+        with self._lock:
+            candidates = [key for key in self.keys if not key.is_parked(now) and key not in (exclude or [])]
+            if not candidates:
+                candidates = [key for key in self.keys if key not in (exclude or [])] or self.keys
+                chosen = min(candidates, key=lambda key: key.last_throttled_at)
+            else:
+                # Smooth weighted round-robin: keys are picked in proportion to their weight, interleaved
+                total = sum(key.weight for key in candidates)
+                for key in candidates:
+                    key.current_weight += key.weight
+                chosen = max(candidates, key=lambda key: key.current_weight)
+                chosen.current_weight -= total
+            chosen.requests += 1
+            return chosen
+
+    def record(self, api_key: ApiKey, status: str):
+        """Record the outcome of a call made with a key, parking it if it was throttled."""
+        API_KEY_REQUESTS.inc(api_key.label, status)
+        if status not in THROTTLED_STATUSES:
+            return
+        with self._lock:
+            api_key.throttled += 1
+            api_key.last_throttled_at = time.time()
+            api_key.parked_until = api_key.last_throttled_at + self.park_seconds
+        API_KEY_PARKED.inc(api_key.label)
+        logger.warning(f"Parked API key {api_key.label} for {self.park_seconds:.0f}s after a {status} response")
+
+    def has_available(self, exclude: List[ApiKey]) -> bool:
+        """Whether there is an unparked key outside exclude."""
+        now = time.time()
+        return any(not key.is_parked(now) and key not in exclude for key in self.keys)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-key usage with masked keys."""
+        now = time.time()
+        return [
+            {
+                "key": key.label,
+                "weight": key.weight,
+                "requests": key.requests,
+                "throttled": key.throttled,
+                "parked_for_s": round(max(0.0, key.parked_until - now), 1),
+            }
+            for key in self.keys
+        ]
+
+_key_pool: Optional[KeyPool] = None
+_key_pool_lock = threading.Lock()
+
+def get_key_pool() -> KeyPool:
+    """Get the process-wide key pool configured from the environment."""
+    global _key_pool
+    with _key_pool_lock:
+        if _key_pool is None:
+            _key_pool = KeyPool.from_env()
+            logger.info(f"API key pool configured with {len(_key_pool)} keys")
+        return _key_pool
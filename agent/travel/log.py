@@ -0,0 +1,148 @@
+"""
+Structured, low-overhead logging.
+
+Log calls on the request path only put the record on a queue. A listener thread does
+the formatting and the writes, so slow terminals or disks never block a turn. Every
+record carries the HTTP request id and the LangGraph thread id it was logged under.
+
+Large payloads such as upstream API responses go through log_payload, which samples
+them and caps their size instead of pretty-printing whole responses.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+import contextvars
+from typing import Any, Optional
+from langchain_core.runnables.config import var_child_runnable_config
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def current_thread_id() -> Optional[str]:
+    """The LangGraph thread id of the runnable currently executing, if any."""
+    config = var_child_runnable_config.get()
+    if not config:
+        return None
+    return (config.get("configurable") or {}).get("thread_id")
+
+class ContextFilter(logging.Filter):
+    """Attach the request and thread ids to a record in the thread that logged it."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.thread_id = current_thread_id()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """One compact JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        if getattr(record, "thread_id", None):
+            entry["thread_id"] = record.thread_id
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    A queue handler that leaves formatting to the listener thread.
+
+    The stdlib QueueHandler formats the message before enqueueing it, which puts
+    the formatting cost back on the request path.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+def configure_logging(level: Optional[str] = None, log_format: Optional[str] = None):
+    """
+    Route all logging through a queue to a background writer. Safe to call more than once.
+
+    LOG_LEVEL sets the level (default INFO) and LOG_FORMAT picks json (default) or text.
+    The CopilotKit SDK pretty-prints whole requests at INFO, so its loggers get their
+    own COPILOTKIT_LOG_LEVEL (default WARNING).
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    log_format = (log_format or os.getenv("LOG_FORMAT", "json")).lower()
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if log_format == "text":
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [request=%(request_id)s thread=%(thread_id)s] %(message)s"))
+    else:
+        stream_handler.setFormatter(JsonFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+
+    copilotkit_level = os.getenv("COPILOTKIT_LOG_LEVEL", "WARNING").upper()
+    for name in ["copilotkit", *[name for name in logging.root.manager.loggerDict if name.startswith("copilotkit.")]]:
+        logging.getLogger(name).setLevel(copilotkit_level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+def log_payload(logger: logging.Logger, message: str, payload: Any, level: int = logging.DEBUG):
+    """
+    Log a large payload, sampled and truncated.
+
+    Only LOG_PAYLOAD_SAMPLE_RATE of the calls (default 0.01) are logged, and the
+    serialized payload is capped at LOG_PAYLOAD_MAX_BYTES (default 2048).
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if random.random() >= float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01")):
+        return
+    max_bytes = int(os.getenv("LOG_PAYLOAD_MAX_BYTES", "2048"))
+    serialized = json.dumps(payload, default=str, separators=(",", ":"))
+    if len(serialized) > max_bytes:
+        serialized = f"{serialized[:max_bytes]}... ({len(serialized)} bytes total)"
+    logger.log(level, "%s: %s", message, serialized)
+
+class RequestContextMiddleware:
+    """ASGI middleware that assigns every HTTP request an id for the logs."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        token = request_id_var.set(request_id or uuid.uuid4().hex)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,146 @@
+"""
+In-process metrics exposed in the Prometheus text format.
+
+Recording is a dictionary update under a lock, and all formatting happens when
+/metrics is scraped, so instrumentation costs next to nothing when nobody is looking.
+"""
+
+import time
+import bisect
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    """A monotonically increasing count per label set."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = list(self._values.items())
+        for labelvalues, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+class Histogram:
+    """Observations bucketed per label set."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str):
+        # Per label set: one count per bucket (non-cumulative), then the +Inf count and the sum
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labelvalues)
+            if series is None:
+                series = self._values[labelvalues] = [0.0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *labelvalues: str) -> Iterator[None]:
+        """Observe the wall time spent in the block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            values = [(labelvalues, list(series)) for labelvalues, series in self._values.items()]
+        for labelvalues, series in values:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, labelvalues, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            inf_labels = _format_labels(self.labelnames, labelvalues, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf_labels} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labelvalues)} {series[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labelvalues)} {series[-1]}")
+        return lines
+
+class Registry:
+    """The set of metrics rendered on /metrics."""
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+
+    def register(self, metric: Any) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+NODE_DURATION = registry.register(Histogram("agent_node_duration_seconds", "Time spent in each graph node.", ["node"]))
+NODE_ERRORS = registry.register(Counter("agent_node_errors_total", "Graph node executions that raised.", ["node"]))
+LLM_DURATION = registry.register(Histogram("llm_request_duration_seconds", "Time spent waiting on the chat model.", ["model"]))
+LLM_TOKENS = registry.register(Counter("llm_tokens_total", "Chat model tokens by direction.", ["model", "direction"]))
+UPSTREAM_DURATION = registry.register(Histogram("upstream_request_duration_seconds", "Google API call latency per tier.", ["tier"]))
+UPSTREAM_REQUESTS = registry.register(Counter("upstream_requests_total", "Google API calls per tier and status.", ["tier", "status"]))
+SEARCH_QUERIES = registry.register(Counter("search_queries_total", "Facility search queries handled by the search node."))
+SEARCH_FALLBACKS = registry.register(Counter("search_fallbacks_total", "Search queries that fell back past the Places API (New), by the tier that answered.", ["tier"]))
+STATE_EMIT_DURATION = registry.register(Histogram("state_emit_duration_seconds", "Time spent emitting intermediate state to the frontend."))
+RESPONSE_CACHE_LOOKUPS = registry.register(Counter("response_cache_lookups_total", "Response cache lookups by result.", ["result"]))
+INTENT_FAST_PATH = registry.register(Counter("intent_fast_path_total", "User turns seen by the intent recognizer by result.", ["result"]))
+SPECULATIVE_SEARCHES = registry.register(Counter("speculative_searches_total", "Searches started while the model was streaming, by outcome (launched, used, discarded).", ["result"]))
+API_KEY_REQUESTS = registry.register(Counter("api_key_requests_total", "Google API calls per pool key (last four characters) and status.", ["key", "status"]))
+API_KEY_PARKED = registry.register(Counter("api_key_parked_total", "Times a pool key was parked after being throttled or denied.", ["key"]))
+ADMISSION_QUEUE_WAIT = registry.register(Histogram("admission_queue_wait_seconds", "Time agent turns waited for a concurrency slot."))
+ADMISSION_REJECTIONS = registry.register(Counter("admission_rejections_total", "Agent turns turned away with a 503, by reason.", ["reason"]))
+DEGRADED_SEARCHES = registry.register(Counter("degraded_searches_total", "Search queries served without calling Google while saturated, by source.", ["source"]))
+
+def instrument_node(name: str, node: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Wrap an async graph node so its duration and failures are recorded."""
+
+    @functools.wraps(node)
+    async def instrumented(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await node(*args, **kwargs)
+        except Exception:
+            NODE_ERRORS.inc(name)
+            raise
+        finally:
+            NODE_DURATION.observe(time.perf_counter() - start, name)
+
+    return instrumented
@@ -0,0 +1,186 @@
+"""
+On-demand sampling profiler for live workers.
+
+When switched on, a background thread samples the Python stacks of every thread (or a
+single thread) at a fixed interval, and an asyncio task measures how late the event
+loop wakes up. The profile stops after a time window or after a number of requests,
+then writes a flamegraph-compatible collapsed-stack file and an event-loop lag report.
+Nothing runs while the profiler is off.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import tempfile
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Hard limit on a profiling window so a forgotten profile cannot run forever
+MAX_PROFILE_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "300"))
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+class SamplingProfiler:
+    """A low-overhead stack sampler that can be started and stopped at runtime."""
+
+    def __init__(self, output_dir: Optional[str] = None):
+        self.output_dir = output_dir or os.getenv("PROFILER_OUTPUT_DIR", os.path.join(tempfile.gettempdir(), "travel-profiles"))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._lag_task: Optional[asyncio.Task] = None
+        self._stacks: Counter = Counter()
+        self._lag_samples: List[float] = []
+        self._session: Optional[Dict[str, Any]] = None
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    @property
+    def active(self) -> bool:
+        return self._session is not None
+
+    def start(self, seconds: Optional[float] = None, requests: Optional[int] = None, thread_id: Optional[int] = None, interval_ms: float = 10):
+        """
+        Start profiling for a number of seconds or until a number of requests have
+        completed, whichever comes first. Must be called from the event loop thread.
+        """
+        with self._lock:
+            if self._session is not None:
+                raise RuntimeError("A profile is already running")
+            seconds = min(seconds or MAX_PROFILE_SECONDS, MAX_PROFILE_SECONDS)
+            interval = max(interval_ms, 1) / 1000
+            self._stacks = Counter()
+            self._lag_samples = []
+            self._stop.clear()
+            self._session = {
+                "started_at": time.time(),
+                "deadline": time.monotonic() + seconds,
+                "seconds": seconds,
+                "max_requests": requests,
+                "requests": 0,
+                "thread_id": thread_id,
+                "interval_ms": interval * 1000,
+                "samples": 0,
+            }
+
+        self._sampler = threading.Thread(target=self._sample_loop, args=(interval, thread_id), name="sampling-profiler", daemon=True)
+        self._sampler.start()
+        self._lag_task = asyncio.get_running_loop().create_task(self._measure_loop_lag(interval))
+        logger.info(f"Profiler started for up to {seconds:.0f}s" + (f" or {requests} requests" if requests else "") + (f" on thread {thread_id}" if thread_id else ""))
+
+    def request_finished(self):
+        """Count a completed request towards the profile's request budget."""
+        session = self._session
+        if session is None:
+            return
+        session["requests"] += 1
+        if session["max_requests"] and session["requests"] >= session["max_requests"]:
+            self._stop.set()
+
+    def stop(self) -> Optional[Dict[str, Any]]:
+        """Stop the running profile now and write its reports."""
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        return self.last_result
+
+    def status(self) -> Dict[str, Any]:
+        """The running profile, the last result and the threads that can be filtered on."""
+        session = dict(self._session) if self._session else None
+        if session:
+            session.pop("deadline", None)
+        return {
+            "active": session,
+            "last_result": self.last_result,
+            "threads": [{"id": thread.ident, "name": thread.name} for thread in threading.enumerate()],
+        }
+
+    def _sample_loop(self, interval: float, thread_id: Optional[int]):
+        own_id = threading.get_ident()
+        session = self._session
+        while not self._stop.is_set() and time.monotonic() < session["deadline"]:
+            frames = sys._current_frames()  # pylint: disable=protected-access
+            for ident, frame in frames.items():
+                if ident == own_id or (thread_id is not None and ident != thread_id):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self._stacks[";".join(reversed(stack))] += 1
+            session["samples"] += 1
+            del frames
+            self._stop.wait(interval)
+        self._finish()
+
+    async def _measure_loop_lag(self, interval: float):
+        loop = asyncio.get_running_loop()
+        while not self._stop.is_set():
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            self._lag_samples.append(max(0.0, loop.time() - expected))
+
+    def _finish(self):
+        session = self._session
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(self.output_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S', time.gmtime(session['started_at']))}")
+
+        collapsed_path = f"{prefix}.collapsed"
+        with open(collapsed_path, "w", encoding="utf-8") as collapsed_file:
+            for stack, count in self._stacks.most_common():
+                collapsed_file.write(f"{stack} {count}\n")
+
+        lag_ms = [lag * 1000 for lag in self._lag_samples]
+        lag_report = {
+            "samples": len(lag_ms),
+            "interval_ms": session["interval_ms"],
+            "p50_ms": _percentile(lag_ms, 50),
+            "p95_ms": _percentile(lag_ms, 95),
+            "p99_ms": _percentile(lag_ms, 99),
+            "max_ms": max(lag_ms, default=0.0),
+        }
+        lag_path = f"{prefix}-loop-lag.json"
+        with open(lag_path, "w", encoding="utf-8") as lag_file:
+            json.dump(lag_report, lag_file, indent=2)
+
+        self.last_result = {
+            "collapsed_stacks": collapsed_path,
+            "loop_lag_report": lag_path,
+            "duration_s": time.time() - session["started_at"],
+            "samples": session["samples"],
+            "requests": session["requests"],
+            "thread_id": session["thread_id"],
+            "loop_lag": lag_report,
+        }
+        with self._lock:
+            self._stop.set()
+            self._session = None
+        logger.info(f"Profiler wrote {collapsed_path} and {lag_path}")
+
+profiler = SamplingProfiler()
+
+class ProfilerRequestMiddleware:
+    """ASGI middleware that counts finished requests towards a running profile."""
+
+    def __init__(self, app: Any, ignored_prefixes: tuple = ("/admin", "/metrics")):
+        self.app = app
+        self.ignored_prefixes = ignored_prefixes
+
+    async def __call__(self, scope: dict, receive: Any, send: Any):
+        if scope["type"] != "http" or not profiler.active or scope["path"].startswith(self.ignored_prefixes):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.request_finished()
@@ -0,0 +1,290 @@
+"""
+Providers for the Google Places and Geocoding endpoints.
+
+Every upstream call made by the search node goes through here. The provider mode is
+chosen with PLACES_PROVIDER_MODE:
+
+- live (default): call Google directly.
+- record: call Google and append every response, with its latency, to a cassette.
+- replay: serve responses from the cassette without an API key or network access,
+  sleeping for the recorded latency multiplied by PLACES_REPLAY_LATENCY_SCALE.
+
+A cassette is a directory holding responses.bin, the compact JSON responses laid end
+to end, and index.jsonl, which maps each canonical query to its offset in that file.
+Replay only parses the index up front and memory-maps the responses, so large
+cassettes load instantly and responses are decoded on demand.
+"""
+
+import os
+import json
+import mmap
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+import requests
+import googlemaps
+import googlemaps.exceptions
+from travel.log import log_payload
+from travel.keys import ApiKey, THROTTLED_STATUSES, get_key_pool
+from travel.metrics import UPSTREAM_DURATION, UPSTREAM_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Base URLs can be pointed at a local stand-in server for benchmarks and offline runs
+PLACES_API_BASE_URL = os.getenv("GOOGLE_PLACES_API_BASE_URL", "https://places.googleapis.com")
+MAPS_API_BASE_URL = os.getenv("GOOGLE_MAPS_API_BASE_URL", "https://maps.googleapis.com")
+
+PLACES_FIELD_MASK = "places.id,places.displayName,places.formattedAddress,places.location,places.rating,places.types,places.nationalPhoneNumber,places.regularOpeningHours,nextPageToken"
+
+# Place Details responses are a single place, so the field mask has no "places." prefix
+PLACE_DETAILS_FIELD_MASK = "id,displayName,formattedAddress,location,rating,types,nationalPhoneNumber,regularOpeningHours,businessStatus"
+
+PROVIDER_MODES = ("live", "record", "replay")
+
+class RecordedError(Exception):
+    """An upstream failure captured in a cassette and raised again on replay."""
+
+def canonical_key(endpoint: str, params: Dict[str, Any]) -> str:
+    """A stable key for an upstream request, insensitive to query casing and spacing."""
+    canonical = {
+        key: " ".join(value.lower().split()) if isinstance(value, str) else value
+        for key, value in params.items()
+    }
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(f"{endpoint}\x00{payload}".encode("utf-8")).hexdigest()
+
+class Cassette:
+    """Append-only store of recorded upstream responses."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.data_path = os.path.join(directory, "responses.bin")
+        self.index_path = os.path.join(directory, "index.jsonl")
+        self._index: Dict[str, tuple[int, int, float]] = {}
+        self._data: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Read the index and memory-map the recorded responses."""
+        self._index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as index_file:
+                for line in index_file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._index[entry["key"]] = (entry["offset"], entry["length"], entry["latency_ms"])
+        if os.path.exists(self.data_path) and os.path.getsize(self.data_path) > 0:
+            with open(self.data_path, "rb") as data_file:
+                self._data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        logger.info(f"Loaded cassette '{self.directory}' with {len(self._index)} recorded responses")
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: str) -> Optional[tuple[Dict[str, Any], float]]:
+        """Return the recorded response and its latency in milliseconds, or None."""
+        entry = self._index.get(key)
+        if entry is None or self._data is None:
+            return None
+        offset, length, latency_ms = entry
+        return json.loads(self._data[offset:offset + length]), latency_ms
+
+    def record(self, key: str, response: Dict[str, Any], latency_ms: float):
+        """Append a response to the cassette."""
+        payload = json.dumps(response, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.data_path, "ab") as data_file:
+                offset = data_file.tell()
+                data_file.write(payload)
+            with open(self.index_path, "a", encoding="utf-8") as index_file:
+                index_file.write(json.dumps({"key": key, "offset": offset, "length": len(payload), "latency_ms": round(latency_ms, 1)}) + "\n")
+            self._index[key] = (offset, len(payload), latency_ms)
+
+def get_gmaps_client(api_key: Optional[ApiKey] = None) -> Optional[googlemaps.Client]:
+    """Get the Google Maps client for a key of the pool (the next one by default), with proper error handling."""
+    try:
+        api_key = api_key or get_key_pool().acquire()
+    except ValueError as e:
+        logger.error(str(e))
+        return None
+    if api_key.client is None:
+        try:
+            # Throttled keys are parked and the call moves to another key, so the client must not retry them itself
+            api_key.client = googlemaps.Client(key=api_key.key, base_url=MAPS_API_BASE_URL, retry_over_query_limit=False)
+        except Exception as e:
+            logger.error(f"Failed to initialize Google Maps client: {e}")
+            return None
+    return api_key.client
+
+def _with_pool_key(call: Callable[[ApiKey], Any]) -> Any:
+    """Make a call with a key from the pool, moving on to another key while keys get throttled."""
+    pool = get_key_pool()
+    tried: List[ApiKey] = []
+    while True:
+        api_key = pool.acquire(exclude=tried)
+        tried.append(api_key)
+        try:
+            result = call(api_key)
+        except Exception as e:
+            status = upstream_status(e)
+            pool.record(api_key, status)
+            if status in THROTTLED_STATUSES and pool.has_available(tried):
+                continue
+            raise
+        pool.record(api_key, "ok")
+        return result
+
+def _search_text_with_key(api_key: ApiKey, payload: Dict[str, Any]) -> Dict[str, Any]:
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": api_key.key,
+        "X-Goog-FieldMask": PLACES_FIELD_MASK,
+    }
+
+    try:
+        response = requests.post(f"{PLACES_API_BASE_URL}/v1/places:searchText", headers=headers, json=payload, timeout=30)
+        logger.debug("API Response status: %d", response.status_code)
+
+        if response.status_code == 403:
+            logger.error(f"403 Forbidden for API key {api_key.label} - Check if Places API (New) is enabled and API key has correct permissions")
+            raise requests.exceptions.HTTPError(f"403 Forbidden: Places API (New) access denied. Please check API key permissions.", response=response)
+
+        response.raise_for_status()
+        result = response.json()
+        log_payload(logger, "API Response", result)
+        return result
+
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Request failed: {e}")
+        if hasattr(e, 'response') and e.response is not None:
+            logger.error(f"Response content: {e.response.text}")
+        raise
+
+def _place_details_with_key(api_key: ApiKey, place_id: str) -> Dict[str, Any]:
+    headers = {
+        "X-Goog-Api-Key": api_key.key,
+        "X-Goog-FieldMask": PLACE_DETAILS_FIELD_MASK,
+    }
+    response = requests.get(f"{PLACES_API_BASE_URL}/v1/places/{place_id}", headers=headers, params={"languageCode": "en"}, timeout=30)
+    response.raise_for_status()
+    result = response.json()
+    log_payload(logger, "Place Details response", result)
+    return result
+
+def _gmaps_client_for(api_key: ApiKey) -> googlemaps.Client:
+    gmaps_client = get_gmaps_client(api_key)
+    if not gmaps_client:
+        raise ValueError("Google Maps client not available")
+    return gmaps_client
+
+def _live_search_text(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return _with_pool_key(lambda api_key: _search_text_with_key(api_key, payload))
+
+def _live_place_details(place_id: str) -> Dict[str, Any]:
+    return _with_pool_key(lambda api_key: _place_details_with_key(api_key, place_id))
+
+def _live_legacy_places(query: str) -> Dict[str, Any]:
+    return _with_pool_key(lambda api_key: _gmaps_client_for(api_key).places(query))
+
+def _live_geocode(query: str) -> list:
+    return _with_pool_key(lambda api_key: _gmaps_client_for(api_key).geocode(query))
+
+def upstream_status(error: Exception) -> str:
+    """A short status label for a failed upstream call."""
+    response = getattr(error, "response", None)
+    if response is not None and getattr(response, "status_code", None):
+        return str(response.status_code)
+    if isinstance(error, googlemaps.exceptions.ApiError):
+        return error.status
+    if isinstance(error, googlemaps.exceptions.HTTPError):
+        return str(error.status_code)
+    if isinstance(error, (requests.exceptions.Timeout, googlemaps.exceptions.Timeout)):
+        return "timeout"
+    if isinstance(error, LookupError):
+        return "not_recorded"
+    return "error"
+
+class PlacesProvider:
+    """Routes upstream calls to Google, to Google and a cassette, or to a cassette alone."""
+
+    def __init__(self, mode: str = "live", cassette_dir: str = "cassettes", latency_scale: float = 1.0):
+        if mode not in PROVIDER_MODES:
+            raise ValueError(f"Unknown PLACES_PROVIDER_MODE '{mode}', expected one of {', '.join(PROVIDER_MODES)}")
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.cassette = Cassette(cassette_dir) if mode != "live" else None
+        if self.cassette is not None:
+            self.cassette.load()
+
+    def _call(self, endpoint: str, params: Dict[str, Any], live_call: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            return self._dispatch(endpoint, params, live_call)
+        except Exception as e:
+            status = upstream_status(e)
+            raise
+        finally:
+            UPSTREAM_DURATION.observe(time.perf_counter() - start, endpoint)
+            UPSTREAM_REQUESTS.inc(endpoint, status)
+
+    def _dispatch(self, endpoint: str, params: Dict[str, Any], live_call: Callable[[], Any]) -> Any:
+        if self.mode == "live":
+            return live_call()
+
+        key = canonical_key(endpoint, params)
+
+        if self.mode == "replay":
+            recorded = self.cassette.get(key)
+            if recorded is None:
+                raise LookupError(f"No recorded {endpoint} response for {params}")
+            response, latency_ms = recorded
+            if latency_ms and self.latency_scale:
+                time.sleep(latency_ms / 1000 * self.latency_scale)
+            if "error" in response:
+                raise RecordedError(response["error"])
+            return response["body"]
+
+        start = time.perf_counter()
+        try:
+            body = live_call()
+        except Exception as e:
+            self.cassette.record(key, {"error": f"{type(e).__name__}: {e}"}, (time.perf_counter() - start) * 1000)
+            raise
+        self.cassette.record(key, {"body": body}, (time.perf_counter() - start) * 1000)
+        return body
+
+    def search_text(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Places API (New) places:searchText."""
+        return self._call("places:searchText", payload, lambda: _live_search_text(payload))
+
+    def place_details(self, place_id: str) -> Dict[str, Any]:
+        """Places API (New) Place Details."""
+        return self._call("places:details", {"id": place_id}, lambda: _live_place_details(place_id))
+
+    def legacy_places(self, query: str) -> Dict[str, Any]:
+        """Legacy Places API text search."""
+        return self._call("places", {"query": query}, lambda: _live_legacy_places(query))
+
+    def geocode(self, query: str) -> list:
+        """Geocoding API lookup."""
+        return self._call("geocode", {"address": query}, lambda: _live_geocode(query))
+
+_provider: Optional[PlacesProvider] = None
+_provider_lock = threading.Lock()
+
+def get_places_provider() -> PlacesProvider:
+    """Get the process-wide provider configured from the environment."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = PlacesProvider(
+                mode=os.getenv("PLACES_PROVIDER_MODE", "live").lower(),
+                cassette_dir=os.getenv("PLACES_CASSETTE_DIR", "cassettes"),
+                latency_scale=float(os.getenv("PLACES_REPLAY_LATENCY_SCALE", "1.0")),
+            )
+            logger.info(f"Places provider running in {_provider.mode} mode")
+        return _provider
@@ -0,0 +1,254 @@
+"""
+Batch refresh of the facilities saved on health profiles.
+
+Walks every thread in the graph's checkpointer, collects the distinct facility ids
+across all profiles, re-fetches each one once through Place Details with bounded
+concurrency and a request rate limit, and writes the refreshed profiles back with a
+single state update per thread. The update is merged into the thread's profiles as they
+are when it is written, and threads with a turn in progress are skipped. Only the
+fields that change upstream (address, location, rating, phone, hours) are updated, and
+facilities Google reports as permanently closed are dropped. The emergency room lists
+for every profile location are refreshed as well.
+
+Threads live in the server's in-memory checkpointer, so the pipeline runs inside the
+server and is started through POST /admin/refresh-facilities. The CLI calls that route:
+
+    poetry run refresh --concurrency 4 --rate 5
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from typing import Any, Dict, List, Optional
+import requests
+from travel.providers import get_places_provider
+from travel.search import facility_from_place, calculate_optimal_map_bounds
+from travel.emergency import emergency_index
+
+logger = logging.getLogger(__name__)
+
+REFRESH_CONCURRENCY = int(os.getenv("REFRESH_CONCURRENCY", "4"))
+REFRESH_REQUESTS_PER_SECOND = float(os.getenv("REFRESH_REQUESTS_PER_SECOND", "5"))
+
+# Fields that change upstream over time. The name, classification and description stay as the user saved them.
+REFRESHED_FIELDS = ("address", "latitude", "longitude", "rating", "phone", "hours")
+
+class RateLimiter:
+    """Spaces request starts evenly so the pipeline never exceeds a request rate."""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1 / requests_per_second if requests_per_second > 0 else 0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class ProgressReporter:
+    """Logs progress and throughput about every tenth of the work."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+        self._step = max(1, total // 10)
+
+    def record(self, ok: bool):
+        self.done += 1
+        if not ok:
+            self.failed += 1
+        if self.done % self._step == 0 or self.done == self.total:
+            logger.info(f"Refreshed {self.done}/{self.total} facilities ({self.failed} failed, {self.throughput():.1f}/s)")
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def throughput(self) -> float:
+        elapsed = self.elapsed()
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+def _thread_ids(checkpointer: Any) -> List[str]:
+    thread_ids = []
+    seen = set()
+    for checkpoint in checkpointer.list(None):
+        thread_id = checkpoint.config["configurable"]["thread_id"]
+        if thread_id not in seen:
+            seen.add(thread_id)
+            thread_ids.append(thread_id)
+    return thread_ids
+
+def refresh_profiles(profiles: List[Dict[str, Any]], refreshed: Dict[str, Optional[Dict[str, Any]]]) -> tuple[List[Dict[str, Any]], int]:
+    """
+    Apply refreshed facilities to profiles by facility id, updating only REFRESHED_FIELDS.
+    Returns the updated profiles and the number of closed facilities removed; facilities
+    that were not refreshed are kept as they are.
+    """
+    closed_removed = 0
+    updated_profiles = []
+    for profile in profiles:
+        facilities = []
+        for facility in profile.get("facilities", []):
+            if facility.get("id") not in refreshed:
+                facilities.append(facility)
+                continue
+            fresh = refreshed[facility["id"]]
+            if fresh is None:
+                closed_removed += 1
+                continue
+            # Keep what the user saw if Google returned a field empty
+            facilities.append({**facility, **{key: fresh[key] for key in REFRESHED_FIELDS if fresh.get(key)}})
+
+        updated_profile = {**profile, "facilities": facilities}
+        if facilities and len(facilities) != len(profile.get("facilities", [])):
+            map_bounds = calculate_optimal_map_bounds(facilities)
+            updated_profile.update({
+                "center_latitude": map_bounds["center_latitude"],
+                "center_longitude": map_bounds["center_longitude"],
+                "zoom_level": map_bounds["zoom_level"],
+            })
+        updated_profiles.append(updated_profile)
+    return updated_profiles, closed_removed
+
+async def fetch_facilities(facility_ids: List[str], concurrency: int, requests_per_second: float) -> tuple[Dict[str, Optional[Dict[str, Any]]], ProgressReporter]:
+    """
+    Fetch Place Details for every id. Returns the refreshed facility per id, None for
+    permanently closed places, and leaves out ids that could not be fetched.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    rate_limiter = RateLimiter(requests_per_second)
+    progress = ProgressReporter(len(facility_ids))
+    provider = get_places_provider()
+    refreshed: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    async def fetch(facility_id: str):
+        async with semaphore:
+            await rate_limiter.wait()
+            try:
+                place = await asyncio.to_thread(provider.place_details, facility_id)
+            except Exception as e:
+                logger.warning(f"Could not refresh facility '{facility_id}': {e}")
+                progress.record(False)
+                return
+        refreshed[facility_id] = None if place.get("businessStatus") == "CLOSED_PERMANENTLY" else facility_from_place(place)
+        progress.record(True)
+
+    await asyncio.gather(*(fetch(facility_id) for facility_id in facility_ids))
+    return refreshed, progress
+
+async def refresh_stored_facilities(graph: Any, concurrency: int = REFRESH_CONCURRENCY, requests_per_second: float = REFRESH_REQUESTS_PER_SECOND, refresh_emergency: bool = True) -> Dict[str, Any]:
+    """Refresh every facility saved on any profile in any thread and return a report."""
+    snapshots = []
+    for thread_id in _thread_ids(graph.checkpointer):
+        config = {"configurable": {"thread_id": thread_id}}
+        snapshot = await graph.aget_state(config)
+        # Leave threads with a turn in progress alone rather than racing the running turn
+        if snapshot.next or not snapshot.values.get("health_profiles"):
+            continue
+        snapshots.append((config, snapshot.values["health_profiles"]))
+
+    facility_ids = []
+    seen_ids = set()
+    facility_references = 0
+    profiles_by_id: Dict[str, Dict[str, Any]] = {}
+    for _, profiles in snapshots:
+        for profile in profiles:
+            profiles_by_id[profile["id"]] = profile
+            for facility in profile.get("facilities", []):
+                facility_references += 1
+                if facility.get("id") and facility["id"] not in seen_ids:
+                    seen_ids.add(facility["id"])
+                    facility_ids.append(facility["id"])
+
+    logger.info(f"Refreshing {len(facility_ids)} distinct facilities ({facility_references} saved) across {len(snapshots)} threads")
+    refreshed, progress = await fetch_facilities(facility_ids, concurrency, requests_per_second)
+
+    threads_updated = 0
+    closed_removed = 0
+    for config, _ in snapshots:
+        # The fetch takes a while, so merge into the profiles as they are now rather than as they were read
+        snapshot = await graph.aget_state(config)
+        if snapshot.next:
+            logger.info(f"Skipping thread '{config['configurable']['thread_id']}', a turn started during the refresh")
+            continue
+        profiles = snapshot.values.get("health_profiles") or []
+        updated_profiles, removed = refresh_profiles(profiles, refreshed)
+        if updated_profiles != profiles:
+            # One write per thread, applied as if the chat node had produced it so the thread stays finished
+            await graph.aupdate_state(config, {"health_profiles": updated_profiles}, as_node="chat_node")
+            threads_updated += 1
+            closed_removed += removed
+
+    emergency_refreshes = 0
+    if refresh_emergency:
+        for profile in profiles_by_id.values():
+            emergency_index.schedule_refresh(profile)
+            emergency_refreshes += 1
+
+    report = {
+        "threads": len(snapshots),
+        "profiles": len(profiles_by_id),
+        "saved_facilities": facility_references,
+        "distinct_facilities": len(facility_ids),
+        "fetched": progress.done - progress.failed,
+        "failed": progress.failed,
+        "closed_removed": closed_removed,
+        "threads_updated": threads_updated,
+        "emergency_refreshes_scheduled": emergency_refreshes,
+        "elapsed_s": round(progress.elapsed(), 3),
+        "facilities_per_second": round(progress.throughput(), 2),
+    }
+    logger.info(f"Facility refresh finished: {report}")
+    return report
+
+def print_report(report: Dict[str, Any]):
+    """Print a refresh report for humans."""
+    print(f"Threads:              {report['threads']} ({report['threads_updated']} updated)")
+    print(f"Profiles:             {report['profiles']}")
+    print(f"Facilities:           {report['distinct_facilities']} distinct of {report['saved_facilities']} saved")
+    print(f"Fetched:              {report['fetched']} ({report['failed']} failed, {report['closed_removed']} closed removed)")
+    print(f"Emergency refreshes:  {report['emergency_refreshes_scheduled']} scheduled")
+    print(f"Throughput:           {report['facilities_per_second']:.2f} facilities/s over {report['elapsed_s']:.1f}s")
+
+def main(argv: Optional[List[str]] = None):
+    """Ask a running server to refresh the facilities saved on its profiles."""
+    parser = argparse.ArgumentParser(description="Refresh the facilities saved on stored health profiles.")
+    parser.add_argument("--url", default=f"http://localhost:{os.getenv('PORT', '8000')}", help="base URL of the running server")
+    parser.add_argument("--concurrency", type=int, default=REFRESH_CONCURRENCY, help="Place Details requests in flight at once")
+    parser.add_argument("--rate", type=float, default=REFRESH_REQUESTS_PER_SECOND, help="maximum Place Details requests per second")
+    parser.add_argument("--skip-emergency", action="store_true", help="do not refresh the emergency room lists")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        parser.error("ADMIN_TOKEN must be set to the server's admin token")
+
+    response = requests.post(
+        f"{args.url}/admin/refresh-facilities",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"concurrency": args.concurrency, "requests_per_second": args.rate, "refresh_emergency": not args.skip_emergency},
+        timeout=None,
+    )
+    if response.status_code != 200:
+        print(f"Refresh failed with {response.status_code}: {response.text}", file=sys.stderr)
+        sys.exit(1)
+
+    report = response.json()
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+
+if __name__ == "__main__":
+    main()
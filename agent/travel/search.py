@@ -2,25 +2,27 @@
 The search node is responsible for searching for healthcare facilities and medical information.
 """
 
-import os
-import json
-import requests
-import googlemaps
+import asyncio
 import logging
-from typing import cast, Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any
 from langchain_core.runnables import RunnableConfig
-from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages import ToolMessage, ToolCall
 from langchain.tools import tool
 from copilotkit.langgraph import copilotkit_emit_state, copilotkit_customize_config
-from travel.state import AgentState
+from travel.state import AgentState, pending_tool_calls
+from travel.providers import get_places_provider
+from travel.cache import recent_search_results
+from travel.cursor import search_cursors, SearchCursor
+from travel.speculative import speculative_searches
+from travel.admission import is_degraded
+from travel.metrics import SEARCH_QUERIES, SEARCH_FALLBACKS, STATE_EMIT_DURATION, DEGRADED_SEARCHES
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @tool
-def search_for_healthcare_facilities(queries: list[str]) -> list[dict]:
-    """Search for healthcare facilities based on a query. Returns a list of healthcare facilities including pediatricians, urgent care centers, hospitals, pharmacies, and other medical facilities with their name, address, coordinates, and contact information."""
+def search_for_healthcare_facilities(queries: list[str], page: str = "first") -> list[dict]:
+    """Search for healthcare facilities based on a query. Returns a list of healthcare facilities including pediatricians, urgent care centers, hospitals, pharmacies, and other medical facilities with their name, address, coordinates, and contact information. Results come in pages of 5: use page="next" with the same queries when the user asks for more results, and page="previous" to go back."""
+    # Paging is handled by the search node's cursors, this direct path only returns the first page
     facilities = []
     for query in queries:
         try:
@@ -30,31 +32,29 @@ def search_for_healthcare_facilities(queries: list[str]) -> list[dict]:
             logger.error(f"Error searching for healthcare facilities with query '{query}': {e}")
 
             # Try fallback to legacy Places API first
-            gmaps_client = get_gmaps_client()
             fallback_success = False
 
-            if gmaps_client:
-                try:
-                    # Add healthcare terms to improve legacy search
-                    healthcare_query = f"{query} doctor hospital clinic medical"
-                    response = gmaps_client.places(healthcare_query)
-                    for result in response.get("results", [])[:5]:  # Limit to 5 results per query
-                        facility = {
-                            "id": result.get("place_id", f"{result.get('name', '')}-{len(facilities)}"),
-                            "name": result.get("name", ""),
-                            "address": result.get("formatted_address", ""),
-                            "latitude": result.get("geometry", {}).get("location", {}).get("lat", 0),
-                            "longitude": result.get("geometry", {}).get("location", {}).get("lng", 0),
-                            "rating": result.get("rating", 0),
-                            "facility_type": "healthcare_facility",
-                            "phone": "",
-                            "hours": "",
-                            "description": "Healthcare Facility"
-                        }
-                        facilities.append(facility)
-                    fallback_success = True
-                except Exception as places_error:
-                    logger.error(f"Legacy Places API also failed for query '{query}': {places_error}")
+            try:
+                # Add healthcare terms to improve legacy search
+                healthcare_query = f"{query} doctor hospital clinic medical"
+                response = get_places_provider().legacy_places(healthcare_query)
+                for result in response.get("results", [])[:5]:  # Limit to 5 results per query
+                    facility = {
+                        "id": result.get("place_id", f"{result.get('name', '')}-{len(facilities)}"),
+                        "name": result.get("name", ""),
+                        "address": result.get("formatted_address", ""),
+                        "latitude": result.get("geometry", {}).get("location", {}).get("lat", 0),
+                        "longitude": result.get("geometry", {}).get("location", {}).get("lng", 0),
+                        "rating": result.get("rating", 0),
+                        "facility_type": "healthcare_facility",
+                        "phone": "",
+                        "hours": "",
+                        "description": "Healthcare Facility"
+                    }
+                    facilities.append(facility)
+                fallback_success = True
+            except Exception as places_error:
+                logger.error(f"Legacy Places API also failed for query '{query}': {places_error}")
 
             # If legacy Places API failed, try geocoding as final fallback
             if not fallback_success:
@@ -74,19 +74,6 @@ def search_for_healthcare_facilities(queries: list[str]) -> list[dict]:
                     logger.error(f"All fallbacks failed for query '{query}': {geocoding_error}")
     return facilities
 
-# Initialize Google Maps client with error handling
-def get_gmaps_client() -> Optional[googlemaps.Client]:
-    """Get Google Maps client with proper error handling."""
-    api_key = os.getenv("GOOGLE_MAPS_API_KEY")
-    if not api_key:
-        logger.error("GOOGLE_MAPS_API_KEY environment variable not set")
-        return None
-    try:
-        return googlemaps.Client(key=api_key)
-    except Exception as e:
-        logger.error(f"Failed to initialize Google Maps client: {e}")
-        return None
-
 def search_places_mock_fallback(query: str) -> list[dict]:
     """Mock search function that returns sample data when APIs are not available."""
     logger.info(f"Using mock fallback for query: {query}")
@@ -138,22 +125,18 @@ def search_places_mock_fallback(query: str) -> list[dict]:
             "rating": 4.0 + (i * 0.2),  # Ratings from 4.0 to 4.8
         }
         mock_places.append(mock_place)
-        logger.info(f"Generated mock place: {mock_place['name']} at {mock_place['address']}")
+        logger.debug("Generated mock place: %s at %s", mock_place['name'], mock_place['address'])
 
     logger.info(f"Mock fallback generated {len(mock_places)} places for query: {query}")
     return mock_places
 
 def search_places_geocoding_fallback(query: str) -> list[dict]:
     """Fallback search using Google Geocoding API when Places API is not available."""
-    gmaps_client = get_gmaps_client()
-    if not gmaps_client:
-        raise ValueError("Google Maps client not available")
-
     logger.info(f"Using geocoding fallback for query: {query}")
 
     try:
         # Use geocoding to find locations
-        geocode_result = gmaps_client.geocode(query)
+        geocode_result = get_places_provider().geocode(query)
         places = []
 
         for i, result in enumerate(geocode_result[:5]):  # Limit to 5 results to match FIFO queue requirements
@@ -170,7 +153,7 @@ def search_places_geocoding_fallback(query: str) -> list[dict]:
                 "rating": 0,  # Geocoding doesn't provide ratings
             }
             places.append(place_data)
-            logger.info(f"Found location: {place_data['name']} at {place_data['address']}")
+            logger.debug("Found location: %s at %s", place_data['name'], place_data['address'])
 
         logger.info(f"Geocoding fallback found {len(places)} locations for query: {query}")
         return places
@@ -179,20 +162,49 @@ def search_places_geocoding_fallback(query: str) -> list[dict]:
         logger.error(f"Geocoding fallback failed: {e}")
         raise
 
-def search_healthcare_facilities_api(query: str) -> list[dict]:
-    """Search for healthcare facilities using the Google Places API (New)"""
-    api_key = os.getenv("GOOGLE_MAPS_API_KEY")
-    if not api_key:
-        raise ValueError("GOOGLE_MAPS_API_KEY environment variable not set")
+def facility_from_place(place: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a Places API (New) place into a facility."""
+    # Determine facility type from place types
+    place_types = place.get("types", [])
+    facility_type = "healthcare_facility"  # default
+
+    if any(t in place_types for t in ["doctor", "hospital"]):
+        facility_type = "hospital"
+    elif "pharmacy" in place_types:
+        facility_type = "pharmacy"
+    elif any(t in place_types for t in ["dentist"]):
+        facility_type = "dentist"
+    elif any(t in place_types for t in ["physiotherapist"]):
+        facility_type = "specialist"
+
+    # Extract phone and hours if available
+    phone = place.get("nationalPhoneNumber", "")
+    hours = ""
+    if place.get("regularOpeningHours"):
+        hours_data = place.get("regularOpeningHours", {})
+        if hours_data.get("weekdayDescriptions"):
+            hours = "; ".join(hours_data["weekdayDescriptions"][:2])  # First 2 days
 
-    url = "https://places.googleapis.com/v1/places:searchText"
-
-    headers = {
-        "Content-Type": "application/json",
-        "X-Goog-Api-Key": api_key,
-        "X-Goog-FieldMask": "places.id,places.displayName,places.formattedAddress,places.location,places.rating,places.types,places.nationalPhoneNumber,places.regularOpeningHours"
+    return {
+        "id": place.get("id", ""),
+        "name": place.get("displayName", {}).get("text", "") if place.get("displayName") else "",
+        "address": place.get("formattedAddress", ""),
+        "latitude": place.get("location", {}).get("latitude", 0),
+        "longitude": place.get("location", {}).get("longitude", 0),
+        "rating": place.get("rating", 0),
+        "facility_type": facility_type,
+        "phone": phone,
+        "hours": hours,
+        "description": f"{facility_type.replace('_', ' ').title()}"
     }
 
+def search_healthcare_facilities_api(query: str, location_bias: Optional[tuple[float, float]] = None, radius_meters: float = 10000) -> list[dict]:
+    """Search for healthcare facilities using the Google Places API (New), optionally biased towards a (latitude, longitude)"""
+    facilities, _ = search_healthcare_facilities_page(query, location_bias=location_bias, radius_meters=radius_meters)
+    return facilities
+
+def search_healthcare_facilities_page(query: str, location_bias: Optional[tuple[float, float]] = None, radius_meters: float = 10000, page_token: Optional[str] = None) -> tuple[list[dict], Optional[str]]:
+    """Fetch one page of healthcare facilities from the Google Places API (New), returning it with the next page token"""
     # Enhance query with healthcare-specific terms if not already present
     healthcare_terms = ["doctor", "pediatrician", "hospital", "clinic", "urgent care", "pharmacy", "medical", "health"]
     if not any(term in query.lower() for term in healthcare_terms):
@@ -200,70 +212,31 @@ def search_healthcare_facilities_api(query: str) -> list[dict]:
 
     data = {
         "textQuery": query,
-        "maxResultCount": 5,  # Limit to 5 results per query to match FIFO queue requirements
+        "pageSize": 5,  # Limit to 5 results per page to match FIFO queue requirements
         "languageCode": "en"
     }
+    if page_token:
+        data["pageToken"] = page_token
+    if location_bias:
+        data["locationBias"] = {
+            "circle": {
+                "center": {"latitude": location_bias[0], "longitude": location_bias[1]},
+                "radius": radius_meters
+            }
+        }
 
-    logger.info(f"Searching for healthcare facilities with query: {query}")
-
-    try:
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        logger.info(f"API Response status: {response.status_code}")
-
-        if response.status_code == 403:
-            logger.error("403 Forbidden - Check if Places API (New) is enabled and API key has correct permissions")
-            raise requests.exceptions.HTTPError(f"403 Forbidden: Places API (New) access denied. Please check API key permissions.")
-
-        response.raise_for_status()
-        result = response.json()
-        logger.info(f"API Response: {json.dumps(result, indent=2)}")
+    logger.debug("Searching for healthcare facilities with query: %s", query)
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Request failed: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            logger.error(f"Response content: {e.response.text}")
-        raise
+    result = get_places_provider().search_text(data)
 
     facilities = []
     for place in result.get("places", []):
-        # Determine facility type from place types
-        place_types = place.get("types", [])
-        facility_type = "healthcare_facility"  # default
-
-        if any(t in place_types for t in ["doctor", "hospital"]):
-            facility_type = "hospital"
-        elif "pharmacy" in place_types:
-            facility_type = "pharmacy"
-        elif any(t in place_types for t in ["dentist"]):
-            facility_type = "dentist"
-        elif any(t in place_types for t in ["physiotherapist"]):
-            facility_type = "specialist"
-
-        # Extract phone and hours if available
-        phone = place.get("nationalPhoneNumber", "")
-        hours = ""
-        if place.get("regularOpeningHours"):
-            hours_data = place.get("regularOpeningHours", {})
-            if hours_data.get("weekdayDescriptions"):
-                hours = "; ".join(hours_data["weekdayDescriptions"][:2])  # First 2 days
-
-        facility_data = {
-            "id": place.get("id", ""),
-            "name": place.get("displayName", {}).get("text", "") if place.get("displayName") else "",
-            "address": place.get("formattedAddress", ""),
-            "latitude": place.get("location", {}).get("latitude", 0),
-            "longitude": place.get("location", {}).get("longitude", 0),
-            "rating": place.get("rating", 0),
-            "facility_type": facility_type,
-            "phone": phone,
-            "hours": hours,
-            "description": f"{facility_type.replace('_', ' ').title()}"
-        }
+        facility_data = facility_from_place(place)
         facilities.append(facility_data)
-        logger.info(f"Found healthcare facility: {facility_data['name']} ({facility_type}) at {facility_data['address']}")
+        logger.debug("Found healthcare facility: %s (%s) at %s", facility_data['name'], facility_data['facility_type'], facility_data['address'])
 
-    logger.info(f"Found {len(facilities)} healthcare facilities for query: {query}")
-    return facilities
+    logger.debug("Found %d healthcare facilities for query: %s", len(facilities), query)
+    return facilities, result.get("nextPageToken")
 
 def calculate_optimal_map_bounds(facilities: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Calculate optimal center point and zoom level for a list of facilities."""
@@ -328,11 +301,101 @@ def apply_fifo_facility_limit(existing_facilities: List[Dict[str, Any]], new_fac
     # The newest facilities (from new_facilities) take priority
     return all_facilities[-max_facilities:]
 
+def search_query_with_fallbacks(query: str, index: int = 0, page_token: Optional[str] = None, remember: bool = True) -> tuple[list[dict], Optional[str]]:
+    """
+    Search one page of a query, returning it with the next page token. The first page
+    falls back from the new Places API to the legacy Places API and then geocoding,
+    which have no further pages. With remember=False the first page is not stored in
+    the recent results.
+    """
+    SEARCH_QUERIES.inc()
+    try:
+        # Try the healthcare facilities API first
+        query_facilities, next_page_token = search_healthcare_facilities_page(query, page_token=page_token)
+        logger.info("Successfully found %d healthcare facilities for query '%s' using new API", len(query_facilities), query)
+        if page_token is None and remember:
+            recent_search_results.set(query, query_facilities)
+        return query_facilities, next_page_token
+    except Exception as e:
+        logger.error(f"Error searching for places with query '{query}' using new API: {e}")
+        # Later pages only exist in the new API
+        if page_token is not None:
+            raise
+
+    # Try fallback to legacy Places API first
+    try:
+        logger.info("Attempting fallback to legacy Places API for query '%s'", query)
+        response = get_places_provider().legacy_places(query)
+        fallback_places = []
+        for result in response.get("results", [])[:5]:  # Limit to 5 results
+            place = {
+                "id": result.get("place_id", f"{result.get('name', '')}-{index}"),
+                "name": result.get("name", ""),
+                "address": result.get("formatted_address", ""),
+                "latitude": result.get("geometry", {}).get("location", {}).get("lat", 0),
+                "longitude": result.get("geometry", {}).get("location", {}).get("lng", 0),
+                "rating": result.get("rating", 0),
+            }
+            fallback_places.append(place)
+        logger.info("Successfully found %d healthcare facilities for query '%s' using legacy Places API", len(fallback_places), query)
+        SEARCH_FALLBACKS.inc("places")
+        if remember:
+            recent_search_results.set(query, fallback_places)
+        return fallback_places, None
+    except Exception as places_error:
+        logger.error(f"Legacy Places API also failed for query '{query}': {places_error}")
+
+    # If legacy Places API failed, try geocoding as fallback
+    try:
+        logger.info("Attempting geocoding fallback for query '%s'", query)
+        geocoding_places = search_places_geocoding_fallback(query)
+        logger.info("Successfully found %d locations for query '%s' using geocoding", len(geocoding_places), query)
+        SEARCH_FALLBACKS.inc("geocode")
+        if remember:
+            recent_search_results.set(query, geocoding_places)
+        return geocoding_places, None
+    except Exception as geocoding_error:
+        SEARCH_FALLBACKS.inc("failed")
+        logger.error(f"All Google APIs failed for query '{query}': {geocoding_error}")
+        logger.error("Please enable the Geocoding API in Google Cloud Console")
+        # Re-raise the exception so the user knows there's a configuration issue
+        raise Exception(f"Google Maps APIs not properly configured. Please enable Geocoding API in Google Cloud Console. Original error: {geocoding_error}")
+
+def query_cursor(thread_id: str, query: str, index: int = 0) -> SearchCursor:
+    """The thread's cursor for a query, fetching pages with the usual fallbacks."""
+    return search_cursors.get(thread_id, query, lambda page_token: search_query_with_fallbacks(query, index, page_token))
+
+def fetch_first_page(query: str) -> tuple[list[dict], Optional[str]]:
+    """Fetch the first page of a query ahead of the search node, without storing it anywhere."""
+    return search_query_with_fallbacks(query, remember=False)
+
+def degraded_search(query: str) -> list[dict]:
+    """Answer a query from recent results only, for use while the worker is saturated."""
+    facilities = recent_search_results.get(query)
+    if facilities is None:
+        DEGRADED_SEARCHES.inc("stored")
+        logger.info("Degraded mode: no recent results for query '%s', keeping the stored facilities", query)
+        return []
+    DEGRADED_SEARCHES.inc("recent")
+    logger.info("Degraded mode: served %d recent facilities for query '%s'", len(facilities), query)
+    return facilities
+
+async def emit_search_state(config: RunnableConfig, state: AgentState):
+    """Emit intermediate search state to the frontend, recording how long it takes."""
+    with STATE_EMIT_DURATION.time():
+        await copilotkit_emit_state(config, state)
+
 async def search_node(state: AgentState, config: RunnableConfig):
     """
     The search node is responsible for searching for healthcare facilities.
+    Every pending search tool call of the turn is handled here, with all of their
+    queries running concurrently. Each query pages through a cursor kept per thread,
+    so follow-up pages are fetched lazily and pages seen before are reused. While the
+    worker is saturated, queries are answered from cached pages or recent results and
+    the profile keeps its stored facilities instead.
     """
-    ai_message = cast(AIMessage, state["messages"][-1])
+    degraded = is_degraded()
+    tool_calls = pending_tool_calls(state["messages"], ["search_for_healthcare_facilities"])
 
     config = copilotkit_customize_config(
         config,
@@ -344,71 +407,63 @@ async def search_node(state: AgentState, config: RunnableConfig):
     )
 
     state["search_progress"] = state.get("search_progress", [])
-    queries = ai_message.tool_calls[0]["args"]["queries"]
+    progress_offset = len(state["search_progress"])
+    searches = [(tool_call, query) for tool_call in tool_calls for query in tool_call["args"].get("queries", [])]
 
-    for query in queries:
+    for _, query in searches:
         state["search_progress"].append({
             "query": query,
             "results": [],
             "done": False
         })
 
-    await copilotkit_emit_state(config, state)
-
-    facilities = []
-    for i, query in enumerate(queries):
-        try:
-            # Try the healthcare facilities API first
-            query_facilities = search_healthcare_facilities_api(query)
-            facilities.extend(query_facilities)
-            logger.info(f"Successfully found {len(query_facilities)} healthcare facilities for query '{query}' using new API")
-        except Exception as e:
-            logger.error(f"Error searching for places with query '{query}' using new API: {e}")
-
-            # Try fallback to legacy Places API first
-            gmaps_client = get_gmaps_client()
-            fallback_success = False
+    await emit_search_state(config, state)
+
+    thread_id = config.get("configurable", {}).get("thread_id", "")
+
+    async def run_search(i: int, tool_call: ToolCall, query: str) -> tuple[Optional[list[dict]], SearchCursor]:
+        page = tool_call["args"].get("page", "first")
+        speculative = speculative_searches.take(thread_id, query)
+        cursor = query_cursor(thread_id, query, i)
+        if speculative is not None:
+            try:
+                # The first page was fetched while the model was streaming
+                first_page = await speculative
+            except Exception as e:
+                logger.warning(f"Speculative search for '{query}' failed, searching again: {e}")
+            else:
+                if first_page is not None and cursor.seed(*first_page):
+                    recent_search_results.set(query, first_page[0])
+        if degraded:
+            # Serving cached pages never waits on a fetch, so it is safe on the event loop
+            query_facilities = cursor.move(page, fetch=False)
+            if query_facilities is None:
+                query_facilities = degraded_search(query) if page == "first" else []
+        else:
+            # The Google clients are blocking, so pages are fetched in a worker thread
+            query_facilities = await asyncio.to_thread(cursor.move, page)
+        state["search_progress"][progress_offset + i]["done"] = True
+        await emit_search_state(config, state)
+        return query_facilities, cursor
 
-            if gmaps_client:
-                try:
-                    logger.info(f"Attempting fallback to legacy Places API for query '{query}'")
-                    response = gmaps_client.places(query)
-                    fallback_places = []
-                    for result in response.get("results", [])[:5]:  # Limit to 5 results
-                        place = {
-                            "id": result.get("place_id", f"{result.get('name', '')}-{i}"),
-                            "name": result.get("name", ""),
-                            "address": result.get("formatted_address", ""),
-                            "latitude": result.get("geometry", {}).get("location", {}).get("lat", 0),
-                            "longitude": result.get("geometry", {}).get("location", {}).get("lng", 0),
-                            "rating": result.get("rating", 0),
-                        }
-                        fallback_places.append(place)
-                    facilities.extend(fallback_places)
-                    logger.info(f"Successfully found {len(fallback_places)} healthcare facilities for query '{query}' using legacy Places API")
-                    fallback_success = True
-                except Exception as places_error:
-                    logger.error(f"Legacy Places API also failed for query '{query}': {places_error}")
-
-            # If legacy Places API failed, try geocoding as fallback
-            if not fallback_success:
-                try:
-                    logger.info(f"Attempting geocoding fallback for query '{query}'")
-                    geocoding_places = search_places_geocoding_fallback(query)
-                    facilities.extend(geocoding_places)
-                    logger.info(f"Successfully found {len(geocoding_places)} locations for query '{query}' using geocoding")
-                    fallback_success = True
-                except Exception as geocoding_error:
-                    logger.error(f"All Google APIs failed for query '{query}': {geocoding_error}")
-                    logger.error("Please enable the Geocoding API in Google Cloud Console")
-                    # Re-raise the exception so the user knows there's a configuration issue
-                    raise Exception(f"Google Maps APIs not properly configured. Please enable Geocoding API in Google Cloud Console. Original error: {geocoding_error}")
+    results = await asyncio.gather(*(run_search(i, tool_call, query) for i, (tool_call, query) in enumerate(searches)))
+    speculative_searches.discard(thread_id)
 
-        state["search_progress"][i]["done"] = True
-        await copilotkit_emit_state(config, state)
+    facilities = []
+    facilities_by_call: Dict[str, List[Dict[str, Any]]] = {tool_call["id"]: [] for tool_call in tool_calls}
+    page_notes: Dict[str, List[str]] = {tool_call["id"]: [] for tool_call in tool_calls}
+    for (tool_call, query), (query_facilities, cursor) in zip(searches, results):
+        if query_facilities is None:
+            direction = "earlier" if tool_call["args"].get("page") == "previous" else "more"
+            page_notes[tool_call["id"]].append(f"There are no {direction} results for '{query}'.")
+            continue
+        facilities.extend(query_facilities)
+        facilities_by_call[tool_call["id"]].extend(query_facilities)
+        more = "more results are available with page 'next'" if cursor.has_next else "there are no more results"
+        page_notes[tool_call["id"]].append(f"'{query}' is on page {cursor.position + 1}, {more}.")
 
     state["search_progress"] = []
-    await copilotkit_emit_state(config, state)
+    await emit_search_state(config, state)
 
     # Add found facilities to the selected health profile with FIFO queue management
     if facilities and state.get("selected_profile_id"):
@@ -436,27 +491,40 @@ async def search_node(state: AgentState, config: RunnableConfig):
                     profile["center_longitude"] = map_bounds["center_longitude"]
                     profile["zoom_level"] = map_bounds["zoom_level"]
 
-                    logger.info(f"Updated health profile '{profile['child_name']}' with {len(updated_facilities)} facilities (FIFO queue applied)")
-                    logger.info(f"Map centered at ({map_bounds['center_latitude']:.4f}, {map_bounds['center_longitude']:.4f}) with zoom level {map_bounds['zoom_level']}")
+                    logger.info("Updated health profile '%s' with %d facilities (FIFO queue applied)", profile['child_name'], len(updated_facilities))
+                    logger.debug("Map centered at (%.4f, %.4f) with zoom level %d", map_bounds['center_latitude'], map_bounds['center_longitude'], map_bounds['zoom_level'])
                 else:
                     logger.info(f"No facilities found for health profile '{profile['child_name']}'")
 
                 break
 
-    # Create appropriate success message
-    if facilities and state.get("selected_profile_id"):
+    # Create appropriate success message for each tool call
+    selected_profile = None
+    if state.get("selected_profile_id"):
         selected_profile = next((p for p in state.get("health_profiles", []) if p["id"] == state["selected_profile_id"]), None)
-        if selected_profile:
-            current_facility_count = len(selected_profile.get("facilities", []))
-            message = f"Found {len(facilities)} healthcare facilities and updated the map. Currently showing {current_facility_count} facilities (maximum 5 maintained using FIFO queue). The map has been automatically centered to show all current facilities."
+
+    for tool_call in tool_calls:
+        call_facilities = facilities_by_call[tool_call["id"]]
+        if call_facilities and state.get("selected_profile_id"):
+            if selected_profile:
+                current_facility_count = len(selected_profile.get("facilities", []))
+                message = f"Found {len(call_facilities)} healthcare facilities and updated the map. Currently showing {current_facility_count} facilities (maximum 5 maintained using FIFO queue). The map has been automatically centered to show all current facilities."
+            else:
+                message = f"Found {len(call_facilities)} healthcare facilities but could not update the selected health profile."
+            if degraded:
+                message += " The service is under heavy load, so these are recent results for the same search."
+        elif degraded:
+            stored_facility_count = len(selected_profile.get("facilities", [])) if selected_profile else 0
+            message = f"The service is under heavy load, so no new search was run. The map still shows the {stored_facility_count} facilities already saved on the profile. Suggest trying the search again in a minute."
         else:
-            message = f"Found {len(facilities)} healthcare facilities but could not update the selected health profile."
-    else:
-        message = "Search completed but no facilities were found or no health profile is selected."
+            message = "Search completed but no facilities were found or no health profile is selected."
+
+        if page_notes[tool_call["id"]]:
+            message += " " + " ".join(page_notes[tool_call["id"]])
 
-    state["messages"].append(ToolMessage(
-        tool_call_id=ai_message.tool_calls[0]["id"],
-        content=message
-    ))
+        state["messages"].append(ToolMessage(
+            tool_call_id=tool_call["id"],
+            content=message
+        ))
 
     return state
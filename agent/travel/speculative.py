@@ -0,0 +1,151 @@
+"""
+Speculative facility searches started while the model is still streaming.
+
+With SPECULATIVE_SEARCH turned on, chat_node streams the model's response and feeds
+the arguments of every search_for_healthcare_facilities call into a QueriesParser. As
+soon as a string in the queries array is complete, the first page of that query is
+fetched in the background, warming the thread's search cursor. search_node then waits
+for the in-flight fetch instead of starting its own, so the Google round-trip overlaps
+with the rest of the generation.
+
+A speculative fetch writes nothing: its first page is handed to search_node, which
+adopts it into the thread's cursor and the recent results only for a query the final
+tool call asks for. Speculative searches for other queries are cancelled. One that has
+not reached Google yet is stopped before it does; one already running in a worker
+thread cannot be interrupted, so its page is dropped instead. Searches that search_node
+never claims, for example because the turn failed, are dropped after
+SPECULATIVE_SEARCH_MAX_AGE_SECONDS.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from travel.cache import normalize_question
+from travel.metrics import SPECULATIVE_SEARCHES
+
+logger = logging.getLogger(__name__)
+
+QUERIES_ARRAY = re.compile(r'"queries"\s*:\s*\[')
+ARRAY_SEPARATORS = re.compile(r'[\s,]*')
+
+_decoder = json.JSONDecoder()
+
+SPECULATIVE_SEARCH_MAX_AGE_SECONDS = float(os.getenv("SPECULATIVE_SEARCH_MAX_AGE_SECONDS", "120"))
+
+def speculative_search_enabled() -> bool:
+    """Whether searches may start before the model has finished its response (default off)."""
+    return os.getenv("SPECULATIVE_SEARCH", "").lower() in ("1", "true", "yes")
+
+class QueriesParser:
+    """Incrementally extracts the completed strings of the queries array from streamed JSON arguments."""
+
+    def __init__(self):
+        self.buffer = ""
+        self.queries: List[str] = []
+        self._position: Optional[int] = None
+        self._closed = False
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add a chunk of the arguments and return the queries it completed."""
+        self.buffer += chunk
+        completed = []
+        if self._closed:
+            return completed
+
+        if self._position is None:
+            match = QUERIES_ARRAY.search(self.buffer)
+            if match is None:
+                return completed
+            self._position = match.end()
+
+        while True:
+            position = ARRAY_SEPARATORS.match(self.buffer, self._position).end()
+            if position >= len(self.buffer):
+                break
+            if self.buffer[position] == "]":
+                self._closed = True
+                break
+            try:
+                value, end = _decoder.raw_decode(self.buffer, position)
+            except json.JSONDecodeError:
+                # The string is still streaming
+                break
+            self._position = end
+            if isinstance(value, str):
+                completed.append(value)
+                self.queries.append(value)
+        return completed
+
+class SpeculativeSearch:
+    """One in-flight speculative fetch."""
+
+    def __init__(self, task: asyncio.Task, cancelled: threading.Event):
+        self.task = task
+        self.cancelled = cancelled
+        self.started_at = time.monotonic()
+
+    def cancel(self):
+        """Stop the fetch if it has not started, and retrieve its failure if it already finished."""
+        self.cancelled.set()
+        if self.task.done() and not self.task.cancelled():
+            # Retrieve the failure of a finished search so asyncio does not log it as never retrieved
+            self.task.exception()
+        else:
+            self.task.cancel()
+
+class SpeculativeSearches:
+    """In-flight speculative searches per thread, keyed by normalized query."""
+
+    def __init__(self, max_age_seconds: float = SPECULATIVE_SEARCH_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self._searches: Dict[str, Dict[str, SpeculativeSearch]] = {}
+
+    def launch(self, thread_id: str, query: str, fetch: Callable[[], Any]):
+        """Start fetching a query in a worker thread unless it is already in flight for the thread."""
+        self._drop_unclaimed()
+        searches = self._searches.setdefault(thread_id, {})
+        key = normalize_question(query)
+        if key in searches:
+            return
+        cancelled = threading.Event()
+
+        def run():
+            # A search discarded before its worker thread started never reaches Google
+            return None if cancelled.is_set() else fetch()
+
+        searches[key] = SpeculativeSearch(asyncio.get_running_loop().create_task(asyncio.to_thread(run)), cancelled)
+        SPECULATIVE_SEARCHES.inc("launched")
+        logger.debug("Speculatively searching '%s' while the model is streaming", query)
+
+    def take(self, thread_id: str, query: str) -> Optional[asyncio.Task]:
+        """Hand over the speculative search for a query, if there is one. Its result is the fetched page."""
+        search = self._searches.get(thread_id, {}).pop(normalize_question(query), None)
+        if search is None:
+            return None
+        SPECULATIVE_SEARCHES.inc("used")
+        return search.task
+
+    def discard(self, thread_id: str, keep: Optional[List[str]] = None):
+        """Cancel the thread's speculative searches for queries not in keep."""
+        searches = self._searches.get(thread_id, {})
+        kept = {normalize_question(query) for query in keep or []}
+        for key in [key for key in searches if key not in kept]:
+            searches.pop(key).cancel()
+            SPECULATIVE_SEARCHES.inc("discarded")
+            logger.debug("Discarded speculative search '%s'", key)
+        if not searches:
+            self._searches.pop(thread_id, None)
+
+    def _drop_unclaimed(self):
+        now = time.monotonic()
+        for thread_id in list(self._searches):
+            if all(now - search.started_at > self.max_age_seconds for search in self._searches[thread_id].values()):
+                logger.debug("Dropping unclaimed speculative searches of thread '%s'", thread_id)
+                self.discard(thread_id)
+
+speculative_searches = SpeculativeSearches()
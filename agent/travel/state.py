@@ -1,4 +1,5 @@
 from typing import TypedDict, List, Optional
+from langchain_core.messages import AnyMessage, AIMessage, ToolMessage, ToolCall
 from langgraph.graph import MessagesState
 
 class HealthFacility(TypedDict):
@@ -42,3 +43,29 @@ class AgentState(MessagesState):
     health_profiles: List[HealthProfile]
     search_progress: List[SearchProgress]
     planning_progress: List[PlanningProgress]
+
+def last_ai_message(messages: List[AnyMessage]) -> Optional[AIMessage]:
+    """The AI message that started the current round of tool calls, skipping trailing tool responses."""
+    ai_message, _ = _current_tool_round(messages)
+    return ai_message
+
+def pending_tool_calls(messages: List[AnyMessage], names: Optional[List[str]] = None) -> List[ToolCall]:
+    """Tool calls of the latest AI message that have no tool response yet, optionally filtered by tool name."""
+    ai_message, tool_messages = _current_tool_round(messages)
+    if ai_message is None:
+        return []
+    answered = {m.tool_call_id for m in tool_messages}
+    return [
+        tool_call for tool_call in ai_message.tool_calls
+        if tool_call["id"] not in answered and (names is None or tool_call["name"] in names)
+    ]
+
+def _current_tool_round(messages: List[AnyMessage]) -> tuple[Optional[AIMessage], List[ToolMessage]]:
+    tool_messages = []
+    for message in reversed(messages):
+        if isinstance(message, AIMessage):
+            return message, tool_messages
+        if not isinstance(message, ToolMessage):
+            break
+        tool_messages.append(message)
+    return None, tool_messages
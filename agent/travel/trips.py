@@ -1,9 +1,10 @@
-from typing import cast, List
+from typing import List
 from langchain_core.messages import ToolMessage, AIMessage
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
-from travel.state import AgentState, HealthProfile, HealthFacility
+from travel.state import AgentState, HealthProfile, HealthFacility, last_ai_message
 from copilotkit.langgraph import copilotkit_emit_message
+from travel.emergency import emergency_index
 
 async def health_profiles_node(state: AgentState, config: RunnableConfig): # pylint: disable=unused-argument
     """
@@ -13,7 +14,7 @@ async def health_profiles_node(state: AgentState, config: RunnableConfig): # pyl
 
 async def perform_health_profiles_node(state: AgentState, config: RunnableConfig):
     """Execute health profile operations"""
-    ai_message = cast(AIMessage, state["messages"][-1])
+    ai_message = last_ai_message(state["messages"])
 
     if not isinstance(ai_message, AIMessage) or not ai_message.tool_calls:
         return state
@@ -38,6 +39,11 @@ async def perform_health_profiles_node(state: AgentState, config: RunnableConfig
             state["messages"].append(tool_message)
             await copilotkit_emit_message(config, tool_message.content)
 
+    # New or moved profiles get their nearest emergency rooms before anyone needs them
+    if any(tool_call["name"] in ("add_health_profiles", "update_health_profiles") for tool_call in ai_message.tool_calls):
+        for profile in state["health_profiles"]:
+            emergency_index.schedule_refresh(profile)
+
     return state
 
 @tool